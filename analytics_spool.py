@@ -0,0 +1,156 @@
+"""
+VTT Analytics spool
+Append-only on-disk log of analytics rows in small segment files, so events
+survive offline periods and restarts. The uploader deletes a segment only
+after the server accepted it (at-least-once; rows carry idempotency keys).
+"""
+import json
+import os
+import threading
+import time
+
+SPOOL_DIR = "analytics_spool"
+SEGMENT_BYTES = 64 * 1024            # Open segment is sealed at this size
+SPOOL_LIMIT_BYTES = 5 * 1024 * 1024  # Oldest segments are dropped above this
+SPOOL_MAX_AGE = 14 * 24 * 3600       # Segments older than this are dropped unsent
+
+
+class Spool:
+    """Segments: `<ns>.part` is being appended to, `<ns>.jsonl` are sealed."""
+
+    def __init__(self, directory=SPOOL_DIR, segment_bytes=SEGMENT_BYTES,
+                 limit_bytes=SPOOL_LIMIT_BYTES, max_age=SPOOL_MAX_AGE):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.limit_bytes = limit_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._size = 0
+        self.open_records = 0  # Rows in the open segment
+        # Sealed segments: path -> (bytes, sealed at), so stats() and the
+        # worker's pending checks never list the directory
+        self._sealed = {}
+
+        # Stats
+        self.appended = 0
+        self.expired = 0  # Segments dropped by size / age limits
+        self._append_time = 0.0
+        self._append_max = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".part"):
+                # A .part left by a crash is complete up to its last full line
+                sealed = path[:-len(".part")] + ".jsonl"
+                os.replace(path, sealed)
+                path = sealed
+            elif not name.endswith(".jsonl"):
+                continue
+            self._sealed[path] = (os.path.getsize(path), os.path.getmtime(path))
+
+    def append(self, table, row):
+        """Hot path: one buffered write + flush to the OS, no fsync.
+
+        Returns the number of rows in the open segment.
+        """
+        started = time.perf_counter()
+        line = json.dumps([table, row], separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._path = os.path.join(self.directory, f"{time.time_ns()}.part")
+                self._file = open(self._path, "a", encoding="utf-8")
+                self._size = 0
+                self.open_records = 0
+            self._file.write(line)
+            self._file.flush()  # Survives an app crash; the OS writes it out
+            self._size += len(line)
+            self.open_records += 1
+            count = self.open_records
+            if self._size >= self.segment_bytes:
+                self._seal()
+            elapsed = time.perf_counter() - started
+            self.appended += 1
+            self._append_time += elapsed
+            self._append_max = max(self._append_max, elapsed)
+        return count
+
+    def _seal(self):
+        # Under self._lock
+        if self._file is None:
+            return
+        self._file.close()
+        sealed = self._path[:-len(".part")] + ".jsonl"
+        os.replace(self._path, sealed)
+        # Size on disk, not self._size: text mode writes \r\n on Windows
+        self._sealed[sealed] = (os.path.getsize(sealed), time.time())
+        self._file = None
+        self._path = None
+        self._size = 0
+        self.open_records = 0
+
+    def seal(self):
+        """Close the open segment so it can be uploaded."""
+        with self._lock:
+            self._seal()
+        self._enforce_limits()
+
+    def segments(self):
+        """Sealed segment paths, oldest first."""
+        with self._lock:
+            # Names are time_ns stamps of equal length, so this is creation order
+            return sorted(self._sealed)
+
+    @property
+    def pending(self):
+        return self.open_records > 0 or bool(self._sealed)
+
+    @staticmethod
+    def read(path):
+        """[(table, row), ...] of a sealed segment; a torn last line is skipped."""
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    table, row = json.loads(line)
+                except ValueError:
+                    continue
+                records.append((table, row))
+        return records
+
+    def remove(self, path):
+        with self._lock:
+            self._sealed.pop(path, None)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _enforce_limits(self):
+        with self._lock:
+            sealed = sorted(self._sealed.items())
+            total = sum(size for size, _ in self._sealed.values())
+        cutoff = time.time() - self.max_age
+        for path, (size, sealed_at) in sealed:
+            if total <= self.limit_bytes and sealed_at >= cutoff:
+                break
+            total -= size
+            self.remove(path)
+            self.expired += 1
+
+    def close(self):
+        with self._lock:
+            self._seal()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "appended": self.appended,
+                "segments": len(self._sealed),
+                "bytes": sum(size for size, _ in self._sealed.values()) + self._size,
+                "expired_segments": self.expired,
+                "append_us_avg": round(self._append_time / self.appended * 1e6, 1) if self.appended else 0,
+                "append_us_max": round(self._append_max * 1e6, 1),
+            }
@@ -0,0 +1,170 @@
+"""
+VTT Animation
+One shared frame clock for all animated widgets.
+Components register once; the scheduler ticks only those that are visible
+and animating, adapts its rate to the frame cost and sleeps when idle.
+"""
+import statistics
+import time
+from collections import deque
+
+DEFAULT_FPS = 30
+MIN_FPS = 10
+FRAME_BUDGET = 0.5  # Share of the frame interval animations may use
+
+
+class FrameScheduler:
+    """Drives component.tick(dt) from a single Tk `after` loop.
+
+    A component is any object with:
+        wants_frame() -> bool   visible and currently animating
+        tick(dt)                advance by dt seconds and update the canvas
+    and optionally a `group` attribute ("decor", "indicator") so the power
+    manager can switch whole groups off. Components must be time based
+    (use dt), so a lower frame rate only makes motion coarser, never slower.
+    """
+
+    def __init__(self, root, fps=DEFAULT_FPS, min_fps=MIN_FPS, budget=FRAME_BUDGET):
+        self.root = root
+        self.target_interval = 1.0 / fps
+        self.max_interval = 1.0 / min_fps
+        self.interval = self.target_interval
+        self.budget = budget
+        self.paused = False
+        self.groups = None  # Allowed component groups, None = all
+        self.components = []
+        self._job = None
+        self._last = None
+        self._due = None  # When the pending tick should fire
+        self._next = 0  # Round-robin start, so dropped ticks are spread evenly
+        self._cost = 0.0  # Smoothed frame cost
+
+        # Stats
+        self.frames = 0
+        self.dropped = 0
+        self.wakeups = 0
+        self._frame_times = deque(maxlen=300)
+        self._jitter = deque(maxlen=300)
+
+    def register(self, component):
+        if component not in self.components:
+            self.components.append(component)
+        self.wake()
+
+    def unregister(self, component):
+        if component in self.components:
+            self.components.remove(component)
+
+    def set_fps(self, fps, groups=None):
+        """Change the target rate and allowed groups; fps 0 pauses everything."""
+        self.paused = fps <= 0
+        self.groups = groups
+        if self.paused:
+            self.stop()
+            return
+        self.target_interval = 1.0 / fps
+        self.interval = self.target_interval
+        self.wake()
+
+    def wake(self):
+        """Start ticking again (call when a component begins animating)."""
+        if self._job is None and not self.paused:
+            self._last = None
+            self._job = self.root.after(1, self._tick)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _active(self):
+        active = []
+        for component in list(self.components):
+            try:
+                exists = getattr(component, "winfo_exists", None)
+                if exists and not exists():
+                    # Widget destroyed (e.g. UI rebuilt) - forget it
+                    self.unregister(component)
+                elif self.groups is not None and getattr(component, "group", None) not in self.groups:
+                    continue
+                elif component.wants_frame():
+                    active.append(component)
+            except Exception:
+                self.unregister(component)
+        return active
+
+    def _tick(self):
+        self._job = None
+        self.wakeups += 1
+        now = time.perf_counter()
+        dt = self.interval if self._last is None else now - self._last
+        if self._due is not None:
+            # How late Tk ran us (busy with other events, audio level updates...)
+            self._jitter.append(max(0.0, now - self._due))
+        self._last = now
+        dt = min(dt, 0.25)  # After a stall, don't jump across the screen
+
+        active = self._active()
+        if not active:
+            # Nothing to draw: no timer at all until wake()
+            self._last = None
+            self._due = None
+            return
+
+        budget = self.interval * self.budget
+        count = len(active)
+        start = self._next % count
+        for k in range(count):
+            if k and time.perf_counter() - now > budget:
+                # Over budget - remaining components skip this frame
+                self.dropped += count - k
+                self._next = start + k
+                break
+            component = active[(start + k) % count]
+            try:
+                component.tick(dt)
+            except Exception as e:
+                print(f"[ANIM] {type(component).__name__} removed: {e}")
+                self.unregister(component)
+
+        cost = time.perf_counter() - now
+        self._frame_times.append(cost)
+        self.frames += 1
+        self._adapt(cost)
+        delay = max(1, int(self.interval * 1000))
+        self._due = time.perf_counter() + delay / 1000
+        self._job = self.root.after(delay, self._tick)
+
+    def _adapt(self, cost):
+        # Slow down while frames are expensive, speed back up when cheap
+        self._cost = self._cost * 0.9 + cost * 0.1
+        if self._cost > self.interval * self.budget:
+            self.interval = min(self.max_interval, self.interval * 1.25)
+        elif self._cost < self.interval * self.budget * 0.5 and self.interval > self.target_interval:
+            self.interval = max(self.target_interval, self.interval * 0.9)
+
+    def stats(self):
+        """Frame cost and jitter in ms over the last few seconds."""
+        times = sorted(self._frame_times)
+        jitter = list(self._jitter)
+        return {
+            "fps": round(1.0 / self.interval, 1),
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "components": len(self.components),
+            "frame_ms_avg": round(statistics.fmean(times) * 1000, 2) if times else 0,
+            "frame_ms_p95": round(times[int(len(times) * 0.95)] * 1000, 2) if times else 0,
+            "jitter_ms_avg": round(statistics.fmean(jitter) * 1000, 2) if jitter else 0,
+            "jitter_ms_max": round(max(jitter) * 1000, 2) if jitter else 0,
+        }
+
+
+# Global scheduler instance (bound to the Tk root on first call)
+_scheduler = None
+
+def get_scheduler(root=None):
+    """Get or create the global frame scheduler."""
+    global _scheduler
+    if _scheduler is None or (root is not None and _scheduler.root is not root):
+        _scheduler = FrameScheduler(root)
+    return _scheduler
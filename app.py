@@ -1,12 +1,16 @@
 """
 Voice-to-Text: F9 для записи -> Groq Whisper -> автовставка
+
+Конвейер: хук клавиши только переключает запись и ставит сессию в очередь,
+пул воркеров кодирует и распознаёт, один поток вставляет текст по порядку.
 """
-import os
+import io
 import sys
 import time
+import queue
+import itertools
 import threading
 import winsound
-import numpy as np
 import sounddevice as sd
 from scipy.io.wavfile import write as write_wav
 import keyboard
@@ -14,11 +18,17 @@ import pyperclip
 import pyautogui
 from groq import Groq
 import config
+from transcriber import ModelSelector, transcribe as transcribe_audio
+from recording import RecordingSession
 
-is_recording = False
-audio_data = []
-recording_thread = None
+session = None  # RecordingSession being captured
 client = None
+selector = ModelSelector(config.WHISPER_MODEL, latency_target=config.LATENCY_TARGET)
+
+# Pipeline: hook -> work_queue -> workers -> paste_queue -> paster
+work_queue = queue.Queue()   # (seq, session)
+paste_queue = queue.Queue()  # (seq, text, timings)
+sequence = itertools.count(1)
 
 
 def beep(freq=800, dur=150):
@@ -28,51 +38,35 @@ def beep(freq=800, dur=150):
         pass
 
 
-def start_recording():
-    global is_recording, audio_data
-    audio_data = []
-    is_recording = True
-    print("\n🎤 Запись... (F9 - стоп)")
-    beep(800, 150)
+def beep_async(freq, dur):
+    # winsound.Beep blocks for `dur` ms - never do that on the hook thread
+    threading.Thread(target=beep, args=(freq, dur), daemon=True).start()
 
-    def callback(indata, frames, time_info, status):
-        if is_recording:
-            audio_data.append(indata.copy())
 
+def record(current):
+    beep_async(800, 150)
     with sd.InputStream(samplerate=config.SAMPLE_RATE, channels=config.CHANNELS,
-                        dtype=config.DTYPE, callback=callback):
-        while is_recording:
-            time.sleep(0.1)
-
-
-def stop_recording():
-    global is_recording
-    is_recording = False
-    beep(400, 150)
-    print("⏹️ Транскрибирую...")
+                        dtype=config.DTYPE, callback=lambda indata, *_: current.append(indata)):
+        while current.is_recording:
+            time.sleep(0.05)
 
-    if not audio_data:
-        return None
 
-    audio = np.concatenate(audio_data, axis=0)
-    write_wav(config.TEMP_AUDIO_FILE, config.SAMPLE_RATE, audio)
-    return config.TEMP_AUDIO_FILE
+def encode(current):
+    """WAV bytes of a session (in memory - workers run in parallel)."""
+    buf = io.BytesIO()
+    write_wav(buf, config.SAMPLE_RATE, current.audio())
+    current.release()
+    return buf.getvalue()
 
 
-def transcribe(audio_file):
-    if not os.path.exists(audio_file):
-        return ""
+def transcribe(audio_bytes, duration):
     try:
-        with open(audio_file, "rb") as f:
-            result = client.audio.transcriptions.create(
-                file=(audio_file, f.read()),
-                model=config.WHISPER_MODEL,
-                language=config.LANGUAGE,
-                response_format="text",
-                prompt=config.TRANSCRIPTION_PROMPT
-            )
-        os.remove(audio_file)
-        return result.strip() if isinstance(result, str) else str(result).strip()
+        return transcribe_audio(
+            client, "recording.wav", audio_bytes, duration,
+            language=config.LANGUAGE,
+            prompt=config.TRANSCRIPTION_PROMPT,
+            selector=selector
+        )
     except Exception as e:
         print(f"❌ Ошибка: {e}")
         return ""
@@ -91,19 +85,67 @@ def paste(text):
         print("⚠️ Текст в буфере")
 
 
+def worker():
+    """Encode + transcribe stopped sessions (several run in parallel)."""
+    while True:
+        seq, current = work_queue.get()
+        timings = {"запись": current.elapsed}
+        current.begin_processing()
+        started = time.perf_counter()
+        timings["ожидание"] = time.time() - current.stopped_at
+
+        text = ""
+        try:
+            audio_bytes = encode(current)
+            encoded = time.perf_counter()
+            timings["кодирование"] = encoded - started
+
+            text = transcribe(audio_bytes, current.duration)
+            timings["распознавание"] = time.perf_counter() - encoded
+        except Exception as e:
+            print(f"❌ Ошибка #{seq}: {e}")
+        finally:
+            # Always hand over, otherwise the paster waits for this seq forever
+            current.finish(success=bool(text))
+            paste_queue.put((seq, text, timings))
+
+
+def paster():
+    """Paste results strictly in dictation order, whatever order they finish in."""
+    next_seq = 1
+    pending = {}
+    while True:
+        seq, text, timings = paste_queue.get()
+        pending[seq] = (text, timings, time.perf_counter())
+        while next_seq in pending:
+            text, timings, ready_at = pending.pop(next_seq)
+            started = time.perf_counter()
+            timings["в очереди вставки"] = started - ready_at
+            paste(text)
+            timings["вставка"] = time.perf_counter() - started
+            stages = " | ".join(f"{name} {value:.2f}с" for name, value in timings.items())
+            print(f"⏱️ #{next_seq}: {stages}")
+            next_seq += 1
+
+
 def on_f9():
-    global is_recording, recording_thread
-    if not is_recording:
-        recording_thread = threading.Thread(target=start_recording, daemon=True)
-        recording_thread.start()
+    """Keyboard hook callback: flip state and enqueue, nothing else."""
+    global session
+    if session is None or not session.is_recording:
+        session = RecordingSession(config.SAMPLE_RATE)
+        threading.Thread(target=record, args=(session,), daemon=True).start()
+        print("\n🎤 Запись... (F9 - стоп)")
     else:
-        audio_file = stop_recording()
-        if audio_file:
-            if recording_thread:
-                recording_thread.join(timeout=1)
-            text = transcribe(audio_file)
-            if text:
-                paste(text)
+        current = session
+        if not current.stop():
+            return
+        beep_async(400, 150)
+        if current.is_empty:
+            current.finish(success=False)
+            return
+        seq = next(sequence)
+        work_queue.put((seq, current))
+        print(f"⏹️ Транскрибирую #{seq}... (в очереди: {work_queue.qsize()})")
 
 
 def main():
@@ -116,9 +158,13 @@ def main():
         print("❌ GROQ_API_KEY не найден в .env!")
         sys.exit(1)
 
-    client = Groq(api_key=config.GROQ_API_KEY)
+    client = Groq(api_key=config.GROQ_API_KEY, max_retries=0)
     print("✅ Groq подключен")
 
+    for _ in range(config.CLI_WORKERS):
+        threading.Thread(target=worker, daemon=True).start()
+    threading.Thread(target=paster, daemon=True).start()
+
     keyboard.add_hotkey(config.HOTKEY, on_f9, suppress=True)
     print(f"✅ Клавиша: {config.HOTKEY}")
     print("\n📌 F9 = старт/стоп записи")
@@ -0,0 +1,183 @@
+"""
+VTT Audio archive
+Opt-in local archive of recordings for re-transcription.
+Files are compressed and content-addressed (sha256 of the WAV), so the same
+audio is stored once. Size-bounded with LRU eviction. Also caches
+transcripts per (audio hash, model, language) to avoid paying twice.
+"""
+import gzip
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+
+# FLAC is ~2x smaller than gzip'ed WAV for speech and Groq accepts it as is
+try:
+    import soundfile as sf
+    FLAC_AVAILABLE = True
+except ImportError:
+    FLAC_AVAILABLE = False
+
+ARCHIVE_DIR = "audio_archive"
+ARCHIVE_LIMIT_MB = 200
+
+
+def audio_hash(wav_bytes):
+    return hashlib.sha256(wav_bytes).hexdigest()
+
+
+def _compress(wav_bytes):
+    """(file extension, bytes) of the archived form."""
+    if FLAC_AVAILABLE:
+        try:
+            data, rate = sf.read(io.BytesIO(wav_bytes), dtype="int16")
+            out = io.BytesIO()
+            sf.write(out, data, rate, format="FLAC")
+            return ".flac", out.getvalue()
+        except Exception as e:
+            print(f"[ARCHIVE] FLAC failed, using gzip: {e}")
+    return ".wav.gz", gzip.compress(wav_bytes, compresslevel=6)
+
+
+class AudioArchive:
+    """Content-addressed recordings + transcript cache, indexed in SQLite."""
+
+    def __init__(self, directory=ARCHIVE_DIR, max_bytes=ARCHIVE_LIMIT_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS audio (
+                    hash TEXT PRIMARY KEY,
+                    file TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    PRIMARY KEY (hash, model, language)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS audio_lru ON audio(last_used)")
+            self._conn.commit()
+
+    def put(self, wav_bytes, duration, digest=None):
+        """Archive a recording (no-op if already stored). Returns its hash."""
+        digest = digest or audio_hash(wav_bytes)
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute("UPDATE audio SET last_used = ? WHERE hash = ?", (now, digest))
+            if cur.rowcount:
+                self._conn.commit()
+                return digest
+
+        ext, data = _compress(wav_bytes)
+        name = digest + ext
+        tmp = os.path.join(self.directory, name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, os.path.join(self.directory, name))
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO audio (hash, file, size, duration, last_used) VALUES (?, ?, ?, ?, ?)",
+                (digest, name, len(data), duration, now)
+            )
+            self._conn.commit()
+            self._evict()
+        print(f"[ARCHIVE] Stored {digest[:12]} ({len(wav_bytes) // 1024} KB -> {len(data) // 1024} KB)")
+        return digest
+
+    def load(self, digest):
+        """(filename, bytes, duration) ready for upload, or None if evicted."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file, duration FROM audio WHERE hash = ?", (digest,)
+            ).fetchone()
+            if row:
+                self._conn.execute("UPDATE audio SET last_used = ? WHERE hash = ?", (time.time(), digest))
+                self._conn.commit()
+        if not row:
+            return None
+        name, duration = row
+        try:
+            with open(os.path.join(self.directory, name), "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"[ARCHIVE] Missing file {name}: {e}")
+            return None
+        if name.endswith(".wav.gz"):
+            return "rec.wav", gzip.decompress(data), duration
+        return "rec.flac", data, duration
+
+    def has(self, digest):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM audio WHERE hash = ?", (digest,)).fetchone() is not None
+
+    def cached_result(self, digest, model, language):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM results WHERE hash = ? AND model = ? AND language = ?",
+                (digest, model, language)
+            ).fetchone()
+        if row:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def store_result(self, digest, model, language, text):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (hash, model, language, text) VALUES (?, ?, ?, ?)",
+                (digest, model, language, text)
+            )
+            self._conn.commit()
+
+    def total_size(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+
+    def _evict(self):
+        # Called with lock held: drop least recently used recordings over the limit
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT hash, file, size FROM audio ORDER BY last_used").fetchall()
+        for digest, name, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            self._conn.execute("DELETE FROM audio WHERE hash = ?", (digest,))
+            self._conn.execute("DELETE FROM results WHERE hash = ?", (digest,))
+            total -= size
+            print(f"[ARCHIVE] Evicted {digest[:12]}")
+        self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM audio"
+            ).fetchone()
+        return {"recordings": count, "bytes": size, "cache_hits": self.hits, "cache_misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
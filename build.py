@@ -5,16 +5,33 @@ Creates standalone EXE using PyInstaller
 import os
 import subprocess
 import shutil
+import sys
+
+from lazy_imports import IMPORT_BUDGET_MS, check_import_budget
 
 APP_NAME = "VTT_SAINT4AI"
 MAIN_SCRIPT = "voice_to_text.py"
 ICON_FILE = "icon.ico"
 
+def check_startup_imports():
+    """Fail the build if importing the app got slower than IMPORT_BUDGET_MS."""
+    module = os.path.splitext(MAIN_SCRIPT)[0]
+    within, total = check_import_budget(module)
+    print(f"Import time of {module}: {total:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    if not within:
+        print(f"Import time over budget - see: python {MAIN_SCRIPT} --startup-profile")
+    return within
+
+
 def build():
     print("=" * 50)
     print("Building VTT @SAINT4AI...")
     print("=" * 50)
 
+    if not check_startup_imports():
+        print("Build failed!")
+        return 1
+
     # Clean previous builds
     for folder in ['build', 'dist']:
         if os.path.exists(folder):
@@ -38,9 +55,9 @@ def build():
         '--hidden-import', 'scipy.io.wavfile',
         '--hidden-import', 'keyboard',
         '--hidden-import', 'pyperclip',
-        '--hidden-import', 'pyautogui',
         '--hidden-import', 'groq',
         '--hidden-import', 'dotenv',
+        '--hidden-import', 'requests',
         '--collect-all', 'customtkinter',
     ]
 
@@ -77,4 +94,4 @@ def build():
 
 
 if __name__ == "__main__":
-    build()
+    sys.exit(build())
@@ -7,6 +7,9 @@ Creates:
 import os
 import subprocess
 import shutil
+import sys
+
+from build import check_startup_imports
 
 MAIN_SCRIPT = "voice_to_text.py"
 ICON_FILE = "icon.ico"
@@ -69,7 +72,6 @@ def build_exe(name, with_admin=False):
         '--hidden-import', 'scipy.io.wavfile',
         '--hidden-import', 'keyboard',
         '--hidden-import', 'pyperclip',
-        '--hidden-import', 'pyautogui',
         '--hidden-import', 'groq',
         '--hidden-import', 'dotenv',
         '--hidden-import', 'requests',
@@ -107,6 +109,10 @@ def main():
 
     results = {}
 
+    if not check_startup_imports():
+        print("Build failed!")
+        return 1
+
     # Build production version (without admin)
     prod_exe = build_exe("VTT", with_admin=False)
     if prod_exe:
@@ -144,4 +150,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
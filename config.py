@@ -4,11 +4,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-WHISPER_MODEL = "whisper-large-v3"
+WHISPER_MODEL = "auto"  # "auto" = turbo for short dictations, large-v3 when latency allows
+LATENCY_TARGET = 2.0  # Seconds we are willing to wait for a transcription
 LANGUAGE = "ru"
 SAMPLE_RATE = 16000
 CHANNELS = 1
 DTYPE = "int16"
 HOTKEY = "F9"
-TEMP_AUDIO_FILE = "temp_recording.wav"
+CLI_WORKERS = 2  # Parallel transcriptions in app.py
 TRANSCRIPTION_PROMPT = "Расставь пунктуацию правильно."
@@ -0,0 +1,295 @@
+"""
+VTT History store
+Append-only SQLite storage for transcription history.
+Appends are O(1), reads are paged (newest first), old entries are trimmed.
+Full-text search via an FTS5 index kept in sync by triggers.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+HISTORY_DB = "history.db"
+HISTORY_LIMIT = 5000   # Entries kept on disk
+TRIM_EVERY = 100       # Enforce the limit every N appends (amortized)
+
+# ё is usually typed as е - fold it on both sides of the index
+_FOLD_SQL = "replace(replace({0}, 'ё', 'е'), 'Ё', 'Е')"
+
+# unicode61 handles Cyrillic incl. Kazakh letters (ә ғ қ ң ө ұ ү һ і) and
+# case folding; prefix indexes make search-as-you-type cheap
+_FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE history_fts USING fts5(
+        text, content='history', content_rowid='id',
+        tokenize='unicode61', prefix='2 3'
+    )""",
+    """CREATE TRIGGER history_fts_insert AFTER INSERT ON history BEGIN
+        INSERT INTO history_fts(rowid, text) VALUES (new.id, {new});
+    END""".format(new=_FOLD_SQL.format("new.text")),
+    """CREATE TRIGGER history_fts_delete AFTER DELETE ON history BEGIN
+        INSERT INTO history_fts(history_fts, rowid, text) VALUES ('delete', old.id, {old});
+    END""".format(old=_FOLD_SQL.format("old.text")),
+]
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_DATE_RE = re.compile(r"^(\d{1,2})\.(\d{1,2})(?:\.(\d{2,4}))?$")  # 19.10 / 19.10.2026
+
+
+def _fold(text):
+    return text.replace("ё", "е").replace("Ё", "Е")
+
+
+class HistoryStore:
+    """Transcription history in SQLite (WAL mode, crash-safe appends).
+
+    Entries are dicts {"id", "text", "timestamp", "audio_hash"} - same shape
+    the UI used with history.json, plus the row id for deletes and the key of
+    the archived recording (None if not archived).
+    """
+
+    def __init__(self, path=HISTORY_DB, max_entries=HISTORY_LIMIT):
+        self.path = path
+        self.max_entries = max_entries
+        self._appends = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self.fts = False
+        self._setup()
+
+    def _setup(self):
+        with self._lock:
+            c = self._conn
+            # Must be set before the first table is created
+            c.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    text TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    audio_hash TEXT
+                )
+            """)
+            columns = [row[1] for row in c.execute("PRAGMA table_info(history)")]
+            if "audio_hash" not in columns:
+                # Databases created before the audio archive existed
+                c.execute("ALTER TABLE history ADD COLUMN audio_hash TEXT")
+            c.commit()
+            self._setup_fts()
+
+    def _setup_fts(self):
+        # Called with lock held. Falls back to LIKE search without FTS5.
+        c = self._conn
+        exists = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'history_fts'"
+        ).fetchone()
+        if exists:
+            self.fts = True
+            return
+        try:
+            for statement in _FTS_SCHEMA:
+                c.execute(statement)
+            # Index rows written before the index existed
+            c.execute("INSERT INTO history_fts(rowid, text) SELECT id, {0} FROM history"
+                      .format(_FOLD_SQL.format("text")))
+            c.commit()
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            c.rollback()
+            print(f"[HISTORY] FTS5 unavailable, using slow search: {e}")
+
+    @staticmethod
+    def _entry(row):
+        return {"id": row[0], "text": row[1], "timestamp": row[2], "audio_hash": row[3]}
+
+    def add(self, text, timestamp=None, audio_hash=None):
+        """Append one entry, returns it."""
+        timestamp = timestamp or datetime.now().isoformat()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO history (text, timestamp, audio_hash) VALUES (?, ?, ?)",
+                (text, timestamp, audio_hash)
+            )
+            self._conn.commit()
+            entry_id = cur.lastrowid
+            self._appends += 1
+            if self._appends % TRIM_EVERY == 0:
+                self._trim()
+        return {"id": entry_id, "text": text, "timestamp": timestamp, "audio_hash": audio_hash}
+
+    def add_many(self, rows):
+        """Bulk append of (text, timestamp) pairs, oldest first."""
+        with self._lock:
+            self._conn.executemany("INSERT INTO history (text, timestamp) VALUES (?, ?)", rows)
+            self._conn.commit()
+            self._trim()
+
+    def recent(self, limit=50, before_id=None):
+        """Newest entries first. Pass the last id of a page to get the next one."""
+        with self._lock:
+            if before_id is None:
+                rows = self._conn.execute(
+                    "SELECT id, text, timestamp, audio_hash FROM history ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT id, text, timestamp, audio_hash FROM history WHERE id < ? ORDER BY id DESC LIMIT ?",
+                    (before_id, limit)
+                ).fetchall()
+        return [self._entry(r) for r in rows]
+
+    def search(self, query, limit=200):
+        """Entries matching all words of the query (prefix match), newest first.
+
+        Words like "19.10" or "19.10.2026" filter by date instead.
+        """
+        words = []
+        date_like = None
+        for part in query.split():
+            m = _DATE_RE.match(part)
+            if m:
+                day, month, year = m.groups()
+                date_like = f"%-{int(month):02d}-{int(day):02d}T%"
+                if year:
+                    year = year if len(year) == 4 else f"20{year}"
+                    date_like = f"{year}{date_like[1:]}"
+            else:
+                words.extend(_WORD_RE.findall(_fold(part)))
+
+        if not words and not date_like:
+            return self.recent(limit)
+
+        where = []
+        params = []
+        if words and self.fts:
+            # Walk the index newest-first so LIMIT stops early on common words.
+            # Quoted tokens can't break FTS syntax; * = prefix match
+            source = "history_fts f JOIN history h ON h.id = f.rowid"
+            order = "f.rowid"
+            where.append("history_fts MATCH ?")
+            params.append(" ".join(f'"{w}"*' for w in words))
+        else:
+            source = "history h"
+            order = "h.id"
+            for w in words:
+                where.append("h.text LIKE ?")
+                params.append(f"%{w}%")
+        if date_like:
+            where.append("h.timestamp LIKE ?")
+            params.append(date_like)
+
+        sql = (f"SELECT h.id, h.text, h.timestamp, h.audio_hash FROM {source} WHERE "
+               + " AND ".join(where) + f" ORDER BY {order} DESC LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [self._entry(r) for r in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def delete(self, entry_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM history WHERE id = ?", (entry_id,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM history")
+            self._conn.commit()
+
+    def _trim(self):
+        # Called with lock held: keep only the newest max_entries rows
+        self._conn.execute(
+            "DELETE FROM history WHERE id < "
+            "(SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.max_entries - 1,)
+        )
+        self._conn.commit()
+
+    def compact(self):
+        """Apply retention and give free pages back to the OS."""
+        with self._lock:
+            self._trim()
+            self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def import_json(self, json_path):
+        """One-time migration from the old history.json (newest first list)."""
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"[ERROR] History migration: {e}")
+            return 0
+
+        rows = [(e.get("text", ""), e.get("timestamp") or datetime.now().isoformat())
+                for e in reversed(entries) if e.get("text")]
+        self.add_many(rows)
+        # Keep the old file as backup, but never import it twice
+        os.replace(json_path, json_path + ".bak")
+        print(f"[HISTORY] Migrated {len(rows)} entries from {json_path}")
+        return len(rows)
+
+    def close(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"[ERROR] History compact: {e}")
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    # Benchmark: python history_store.py [entries]
+    import sys
+    import tempfile
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    path = os.path.join(tempfile.mkdtemp(), "bench_history.db")
+    store = HistoryStore(path, max_entries=n)
+
+    text = "Пример транскрибации для бенчмарка истории " * 3
+    start = time.perf_counter()
+    store.add_many((f"{text} {i}", datetime.now().isoformat()) for i in range(n))
+    print(f"Bulk fill {n}: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        store.add(f"{text} new {i}")
+    print(f"add(): {(time.perf_counter() - start) / 1000 * 1e6:.0f} us/entry")
+    store.close()
+
+    # Startup path: open + read the page the UI shows
+    start = time.perf_counter()
+    store = HistoryStore(path, max_entries=n)
+    page = store.recent(50)
+    total = store.count()
+    print(f"Open + first page ({len(page)} of {total}): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    page = store.recent(50, before_id=page[-1]["id"])
+    print(f"Next page: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    # Search-as-you-type: every prefix of a query, like typing it
+    for query in ["бенчмарка истории", "пример new 99", "несуществующее", "19.10"]:
+        start = time.perf_counter()
+        for i in range(1, len(query) + 1):
+            found = store.search(query[:i])
+        per_key = (time.perf_counter() - start) / len(query) * 1000
+        print(f"search {query!r}: {len(found)} hits, {per_key:.1f} ms per keystroke")
+
+    # Old approach for comparison: full history.json rewrite per dictation
+    entries = [{"text": f"{text} {i}", "timestamp": datetime.now().isoformat()} for i in range(n)]
+    json_path = os.path.join(os.path.dirname(path), "history.json")
+    start = time.perf_counter()
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+    print(f"history.json rewrite ({n}): {(time.perf_counter() - start) * 1000:.0f} ms per dictation")
+    store.close()
@@ -0,0 +1,63 @@
+"""
+VTT Translations
+Widgets bind to text keys once; switching the language relabels them in
+place instead of rebuilding the UI.
+"""
+import time
+
+
+class Translator:
+    """Current-language lookup plus a registry of widgets bound to keys."""
+
+    def __init__(self, texts, lang="ru", fallback="ru"):
+        self.texts = texts
+        self.fallback = fallback
+        self.lang = lang if lang in texts else fallback
+        self._bindings = []   # (widget, key, option, fmt)
+        self._callbacks = []  # fn() for things that aren't a single option
+
+    def t(self, key):
+        """Get translation."""
+        return self.texts.get(self.lang, self.texts[self.fallback]).get(key, key)
+
+    def bind(self, widget, key, option="text", fmt=None):
+        """Label `widget` with `key` now and on every language switch. Returns widget.
+
+        fmt(text) can decorate the text, e.g. add a counter.
+        """
+        text = self.t(key)
+        widget.configure(**{option: fmt(text) if fmt else text})
+        self._bindings.append((widget, key, option, fmt))
+        return widget
+
+    def on_change(self, callback):
+        """callback() runs after every language switch (combos, stateful labels)."""
+        self._callbacks.append(callback)
+
+    def set_language(self, lang):
+        """Relabel all bound widgets in one pass. Returns the number relabeled."""
+        started = time.perf_counter()
+        self.lang = lang if lang in self.texts else self.fallback
+
+        alive = []
+        for binding in self._bindings:
+            widget, key, option, fmt = binding
+            try:
+                if not widget.winfo_exists():
+                    continue
+                text = self.t(key)
+                widget.configure(**{option: fmt(text) if fmt else text})
+                alive.append(binding)
+            except Exception as e:
+                print(f"[I18N] {key}: {e}")
+        self._bindings = alive
+
+        for callback in list(self._callbacks):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[I18N] Callback failed: {e}")
+
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"[I18N] Switched to {self.lang}: {len(alive)} widgets in {elapsed:.1f} ms")
+        return len(alive)
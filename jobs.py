@@ -0,0 +1,203 @@
+"""
+VTT Jobs
+Every dictation is a job with an id and a cancellation token.
+"""
+import io
+import itertools
+import queue
+import threading
+import time
+
+# What to do with a running job when the user starts a new dictation.
+# Queue is the default: cancel_previous is faster but loses the earlier text.
+POLICY_CANCEL_PREVIOUS = "cancel_previous"
+POLICY_QUEUE = "queue"
+POLICY_RUN_BOTH = "run_both"
+POLICIES = [POLICY_QUEUE, POLICY_RUN_BOTH, POLICY_CANCEL_PREVIOUS]
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once its token was cancelled."""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag with interruptible waits."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.reason = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[ERROR] Cancel callback: {e}")
+
+    def on_cancel(self, callback):
+        """Run callback when cancelled (immediately if already cancelled)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise JobCancelled(self.reason)
+
+    def wait(self, seconds):
+        """Sleep up to `seconds`; raises JobCancelled if cancelled meanwhile."""
+        if self._event.wait(seconds):
+            raise JobCancelled(self.reason)
+
+
+class CancellableUpload(io.RawIOBase):
+    """Read-only file for request bodies that stops mid-transfer on cancel.
+
+    HTTP clients read multipart files in chunks, so raising from read()
+    aborts the upload and frees the connection for the next job.
+    """
+
+    def __init__(self, data, token, chunk_size=64 * 1024):
+        self._data = memoryview(data)
+        self._pos = 0
+        self._token = token
+        self._chunk_size = chunk_size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._data) + offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def read(self, size=-1):
+        self._token.raise_if_cancelled()
+        if size is None or size < 0:
+            size = len(self._data) - self._pos
+        size = min(size, self._chunk_size)
+        chunk = bytes(self._data[self._pos:self._pos + size])
+        self._pos += len(chunk)
+        return chunk
+
+    def readinto(self, buffer):
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class Job:
+    """One dictation: identity, cancellation token and timings."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind="dictation"):
+        self.id = next(self._ids)
+        self.kind = kind
+        self.token = CancelToken()
+        self.created = time.time()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self, reason="cancelled"):
+        self.token.cancel(reason)
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled else "active"
+        return f"<Job #{self.id} {self.kind} {state}>"
+
+
+class JobManager:
+    """Runs job functions in the background according to the policy."""
+
+    def __init__(self, policy=POLICY_QUEUE):
+        self.policy = policy if policy in POLICIES else POLICY_QUEUE
+        self._active = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+
+    def set_policy(self, policy):
+        if policy in POLICIES:
+            self.policy = policy
+
+    def new_job(self, kind="dictation"):
+        """Create a job for a new dictation, applying the policy to older ones."""
+        if self.policy == POLICY_CANCEL_PREVIOUS:
+            self.cancel_all("superseded")
+        job = Job(kind)
+        with self._lock:
+            self._active[job.id] = job
+        return job
+
+    def submit(self, job, fn):
+        """Run fn(job) - queued behind earlier jobs or in its own thread."""
+        if self.policy == POLICY_QUEUE:
+            self._queue.put((job, fn))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._drain, daemon=True)
+                self._worker.start()
+        else:
+            threading.Thread(target=self._run, args=(job, fn), daemon=True).start()
+
+    def _drain(self):
+        # Single long-lived worker: jobs run strictly one after another
+        while True:
+            job, fn = self._queue.get()
+            self._run(job, fn)
+
+    def _run(self, job, fn):
+        # The job stays active (cancellable) until finish() - results are
+        # still delivered on the UI thread after fn returns
+        try:
+            job.token.raise_if_cancelled()
+            fn(job)
+        except JobCancelled:
+            print(f"[JOB] #{job.id} cancelled ({job.token.reason})")
+            self.finish(job)
+        except Exception as e:
+            print(f"[ERROR] Job #{job.id}: {e}")
+            self.finish(job)
+
+    def finish(self, job):
+        """Mark job as done (no longer cancelled by new dictations)."""
+        with self._lock:
+            self._active.pop(job.id, None)
+
+    def cancel_all(self, reason="cancelled"):
+        with self._lock:
+            jobs = list(self._active.values())
+        for job in jobs:
+            job.cancel(reason)
+        return len(jobs)
+
+    @property
+    def active_count(self):
+        with self._lock:
+            return len(self._active)
@@ -0,0 +1,139 @@
+"""
+VTT Lazy imports
+Heavy dependencies are imported on first attribute access instead of at
+startup, and every such import is timed for --startup-profile.
+"""
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Module-level import cost of the main app we accept before the window can
+# appear (fresh interpreter, warm disk cache). --startup-profile fails above it.
+IMPORT_BUDGET_MS = 600
+
+_registry = {}  # name -> LazyModule
+_timings = {}   # name -> ms spent importing on first use
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """Stands in for a module until an attribute is used."""
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    _timings[self._name] = (time.perf_counter() - started) * 1000
+                    self._module = module
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Module proxy imported on first use. One proxy per name."""
+    with _lock:
+        if name not in _registry:
+            _registry[name] = LazyModule(name)
+        return _registry[name]
+
+
+def is_available(name):
+    """True if `name` could be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def import_timings():
+    """{module: ms} for lazy modules loaded so far."""
+    return dict(_timings)
+
+
+def load_all():
+    """Import every registered module now; returns {module: ms or error}."""
+    results = {}
+    for name, module in list(_registry.items()):
+        try:
+            module._load()
+            results[name] = round(_timings.get(name, 0.0), 1)
+        except Exception as e:
+            results[name] = f"error: {e}"
+    return results
+
+
+def profile_imports(module, top=15):
+    """Per-module import cost of `module` in a fresh interpreter.
+
+    Uses `python -X importtime`, so numbers include cold imports that the
+    running process may already have cached. Returns
+    {"total_ms": float, "modules": [(name, cumulative_ms), ...]} or None
+    when frozen (no interpreter to spawn).
+    """
+    if getattr(sys, "frozen", False):
+        return None
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        # -X importtime still prints a row for a module whose import raised
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()[-500:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(cumulative) / 1000))
+
+    index = next((i for i in range(len(rows) - 1, -1, -1) if rows[i][1] == module), None)
+    if index is None:
+        raise RuntimeError(f"no import time reported for {module}")
+    root_depth, _, total = rows[index]
+    # Output is post-order: the module's subtree directly precedes it.
+    # Its direct children are what its own import statements cost.
+    children = []
+    for depth, name, ms in reversed(rows[:index]):
+        if depth <= root_depth:
+            break
+        if depth == root_depth + 1:
+            children.append((name, round(ms, 1)))
+    children.sort(key=lambda item: -item[1])
+    return {"total_ms": round(total, 1), "modules": children[:top]}
+
+
+def check_import_budget(module, budget_ms=IMPORT_BUDGET_MS, runs=3):
+    """Import-time regression gate for builds. Returns (within budget, best ms).
+
+    Best of `runs` fresh interpreters: the first run also writes .pyc files
+    and one-off disk stalls shouldn't fail a build. Raises RuntimeError if
+    the module can't be imported at all.
+    """
+    best = min(profile_imports(module)["total_ms"] for _ in range(runs))
+    return best <= budget_ms, best
@@ -0,0 +1,158 @@
+"""
+VTT Power states
+Decides how much the UI may animate: full while dictating, reduced when
+idle in the foreground, nothing at all when minimized or the screen is
+locked. In the idle states no animation timer is left running.
+"""
+import ctypes
+import time
+
+ACTIVE = "active"                    # Recording
+FOREGROUND_IDLE = "foreground_idle"  # Window shown, nothing happening
+BACKGROUND = "background"            # Minimized / in the tray
+LOCKED = "locked"                    # Workstation locked
+STATES = [ACTIVE, FOREGROUND_IDLE, BACKGROUND, LOCKED]
+
+# fps for the frame scheduler and which animation groups may run
+PROFILES = {
+    ACTIVE: {"fps": 30, "groups": {"decor", "indicator"}},
+    FOREGROUND_IDLE: {"fps": 20, "groups": {"decor"}},
+    BACKGROUND: {"fps": 0, "groups": set()},
+    LOCKED: {"fps": 0, "groups": set()},
+}
+
+POLL_INTERVAL = 5.0   # Lock / idle check while something animates
+IDLE_TIMEOUT = 60.0   # Decorations freeze after this long without input
+
+
+def is_screen_locked():
+    """True while the workstation is locked (Windows; False elsewhere)."""
+    try:
+        user32 = ctypes.windll.user32
+    except AttributeError:
+        return False
+    # The input desktop can't be opened while the lock screen is shown
+    desktop = user32.OpenInputDesktop(0, False, 0x0100)  # DESKTOP_SWITCHDESKTOP
+    if not desktop:
+        return True
+    user32.CloseDesktop(desktop)
+    return False
+
+
+class PowerManager:
+    """State machine over recording / window visibility / lock / user input."""
+
+    def __init__(self, root, scheduler, poll_interval=POLL_INTERVAL, idle_timeout=IDLE_TIMEOUT):
+        self.root = root
+        self.scheduler = scheduler
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.recording = False
+        self.visible = False
+        self.locked = False
+        self.last_input = time.monotonic()
+        self.decor_frozen = False
+        self.state = None
+        self._applied = None
+        self._poll_job = None
+
+        # Diagnostics: time and wakeups spent in each state
+        self.polls = 0
+        self._entered = time.monotonic()
+        self._wakeups_at_entry = 0
+        self._time = {state: 0.0 for state in STATES}
+        self._wakeups = {state: 0 for state in STATES}
+
+    def set_recording(self, recording):
+        self.recording = recording
+        self.last_input = time.monotonic()
+        self._update()
+
+    def set_visible(self, visible):
+        self.visible = visible
+        self.last_input = time.monotonic()
+        self.locked = is_screen_locked()
+        self._update()
+
+    def touch(self):
+        """User input in any window - cheap, called for every mouse move."""
+        self.last_input = time.monotonic()
+        if self.decor_frozen or self.locked:
+            self.locked = is_screen_locked()
+            self.decor_frozen = False
+            self._update()
+
+    def _wakeups_total(self):
+        return self.scheduler.wakeups + self.polls
+
+    def _update(self):
+        if self.locked:
+            state = LOCKED
+        elif self.recording:
+            state = ACTIVE
+        elif self.visible:
+            state = FOREGROUND_IDLE
+        else:
+            state = BACKGROUND
+
+        if state != self.state:
+            self._account()
+            if self.state:
+                print(f"[POWER] {self.state} -> {state}")
+            self.state = state
+            self.decor_frozen = False
+        self._apply()
+
+    def _apply(self):
+        profile = PROFILES[self.state]
+        groups = set(profile["groups"])
+        if self.decor_frozen:
+            groups.discard("decor")
+        fps = profile["fps"] if groups else 0
+        if (fps, groups) != self._applied:
+            self._applied = (fps, groups)
+            self.scheduler.set_fps(fps, groups)
+
+        # Poll only while something animates: that is what the lock / idle
+        # checks could switch off. Fully idle states have no timers at all.
+        if groups and self._poll_job is None:
+            self._poll_job = self.root.after(int(self.poll_interval * 1000), self._poll)
+        elif not groups and self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+
+    def _poll(self):
+        self._poll_job = None
+        self.polls += 1
+        self.locked = is_screen_locked()
+        if self.state == FOREGROUND_IDLE and time.monotonic() - self.last_input > self.idle_timeout:
+            # Nobody is looking: freeze the background until the next input
+            self.decor_frozen = True
+        self._update()
+
+    def _account(self):
+        now = time.monotonic()
+        wakeups = self._wakeups_total()
+        if self.state:
+            self._time[self.state] += now - self._entered
+            self._wakeups[self.state] += wakeups - self._wakeups_at_entry
+        self._entered = now
+        self._wakeups_at_entry = wakeups
+
+    def report(self):
+        """Seconds spent and timer wakeups per second in each state."""
+        self._account()
+        return {
+            state: {
+                "seconds": round(self._time[state], 1),
+                "wakeups_per_sec": round(self._wakeups[state] / self._time[state], 2)
+                if self._time[state] else 0,
+            }
+            for state in STATES
+        }
+
+    def stop(self):
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.scheduler.set_fps(0)
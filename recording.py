@@ -0,0 +1,135 @@
+"""
+VTT Recording sessions
+One object per dictation with its own audio buffer, timings and state,
+so capturing the next dictation never touches the one being transcribed.
+"""
+import itertools
+import threading
+import time
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+class RecordingSession:
+    """Audio buffer + state machine of a single dictation.
+
+    recording -> stopped -> processing -> done / failed
+    """
+
+    RECORDING = "recording"
+    STOPPED = "stopped"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+    _TRANSITIONS = {
+        RECORDING: (STOPPED, FAILED),
+        STOPPED: (PROCESSING, DONE, FAILED),
+        PROCESSING: (DONE, FAILED),
+        DONE: (),
+        FAILED: (),
+    }
+
+    _ids = itertools.count(1)
+
+    __slots__ = ("id", "state", "sample_rate", "chunks", "frames", "job",
+                 "started_at", "last_sound_at", "stopped_at",
+                 "processing_at", "finished_at", "_lock")
+
+    def __init__(self, sample_rate=16000, job=None):
+        self.id = next(self._ids)
+        self.state = self.RECORDING
+        self.sample_rate = sample_rate
+        self.chunks = []
+        self.frames = 0
+        self.job = job
+        self.started_at = time.time()
+        self.last_sound_at = self.started_at
+        self.stopped_at = None
+        self.processing_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def _move(self, state):
+        """Change state; returns False if the transition is not allowed."""
+        with self._lock:
+            if state not in self._TRANSITIONS[self.state]:
+                return False
+            self.state = state
+            return True
+
+    @property
+    def is_recording(self):
+        return self.state == self.RECORDING
+
+    def append(self, chunk):
+        """Add a captured block (audio callback thread). Ignored once stopped."""
+        with self._lock:
+            if self.state != self.RECORDING:
+                return
+            self.chunks.append(chunk.copy())
+            self.frames += len(chunk)
+
+    def mark_sound(self):
+        self.last_sound_at = time.time()
+
+    def stop(self):
+        """Stop capturing. Returns False if it was already stopped."""
+        if not self._move(self.STOPPED):
+            return False
+        self.stopped_at = time.time()
+        return True
+
+    def begin_processing(self):
+        if self._move(self.PROCESSING):
+            self.processing_at = time.time()
+
+    def finish(self, success=True):
+        if self._move(self.DONE if success else self.FAILED):
+            self.finished_at = time.time()
+            print(f"[SESSION] #{self.id} {self.state}: {self.timings()}")
+
+    @property
+    def duration(self):
+        """Seconds of captured audio."""
+        return self.frames / self.sample_rate
+
+    @property
+    def elapsed(self):
+        """Wall time since recording started (until stop)."""
+        return (self.stopped_at or time.time()) - self.started_at
+
+    @property
+    def silence(self):
+        return time.time() - self.last_sound_at
+
+    @property
+    def is_empty(self):
+        return not self.chunks
+
+    def audio(self):
+        """Whole recording as one array (call after stop)."""
+        with self._lock:
+            chunks = list(self.chunks)
+        return np.concatenate(chunks, axis=0)
+
+    def release(self):
+        """Drop the buffer once the audio was handed off."""
+        with self._lock:
+            self.chunks = []
+
+    def timings(self):
+        """Per-stage durations in seconds."""
+        def span(a, b):
+            return round(b - a, 3) if a and b else None
+        return {
+            "capture": span(self.started_at, self.stopped_at),
+            "wait": span(self.stopped_at, self.processing_at),
+            "process": span(self.processing_at, self.finished_at),
+            "total": span(self.started_at, self.finished_at),
+        }
+
+    def __repr__(self):
+        return f"<RecordingSession #{self.id} {self.state} {self.duration:.1f}s>"
@@ -0,0 +1,238 @@
+"""
+VTT Resilience
+Deadlines, bounded retries and circuit breakers for outbound API calls.
+"""
+import random
+import threading
+import time
+
+# HTTP statuses worth retrying (timeouts, rate limits, server errors)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is known to be down."""
+
+    def __init__(self, name):
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the call budget ran out before any attempt succeeded."""
+
+
+class Deadline:
+    """Absolute time budget shared by all attempts of one call."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+
+def deadline_for_audio(duration, base=6.0, per_second=0.5, cap=60.0):
+    """Budget for a transcription: fixed part + upload/processing per audio second."""
+    return min(cap, base + per_second * max(0.0, duration))
+
+
+def is_retryable(error):
+    """True for timeouts, connection drops, rate limits and 5xx answers."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS or status >= 500
+
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # groq.APITimeoutError / APIConnectionError, requests Timeout / ConnectionError
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+class CircuitBreaker:
+    """Classic closed -> open -> half-open breaker.
+
+    After `failure_threshold` consecutive failures calls are rejected for
+    `reset_timeout` seconds, then a single probe call is let through.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """callback(name, state) is called on every state change (any thread)."""
+        self._listeners.append(callback)
+
+    def _set_state(self, state):
+        # Called with lock held; listeners run after release
+        if state == self.state:
+            return None
+        self.state = state
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        print(f"[CIRCUIT] {self.name}: {state}")
+        return state
+
+    def _notify(self, state):
+        if state is None:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(self.name, state)
+            except Exception as e:
+                print(f"[ERROR] Circuit listener: {e}")
+
+    def allow(self):
+        """May a call go through right now?"""
+        changed = None
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                changed = self._set_state(self.HALF_OPEN)
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    allowed = False
+                else:
+                    self._probe_in_flight = True
+                    allowed = True
+            else:
+                allowed = True
+        self._notify(changed)
+        return allowed
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            changed = self._set_state(self.CLOSED)
+        self._notify(changed)
+
+    def release(self):
+        """Call ended without telling anything about upstream health."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            changed = None
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                changed = self._set_state(self.OPEN)
+                self.opened_at = time.monotonic()
+        self._notify(changed)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+def call_with_retry(fn, deadline, breaker=None, attempts=3, base_delay=0.5, max_delay=4.0,
+                    token=None):
+    """Call fn(timeout) until it succeeds, the attempts or the deadline run out.
+
+    Each attempt gets the remaining budget as its timeout. Retries use full
+    jitter exponential backoff and only happen for retryable errors. With a
+    cancel token (jobs.CancelToken) the call stops as soon as it is cancelled.
+    """
+    if not isinstance(deadline, Deadline):
+        deadline = Deadline(deadline)
+
+    last_error = None
+    for attempt in range(attempts):
+        if token:
+            token.raise_if_cancelled()
+        if breaker and not breaker.allow():
+            raise CircuitOpenError(breaker.name)
+
+        timeout = deadline.remaining()
+        if timeout <= 0:
+            break
+
+        try:
+            result = fn(timeout)
+        except Exception as e:
+            if token and token.cancelled:
+                # Aborted on purpose (the SDK may wrap it) - not an upstream failure
+                if breaker:
+                    breaker.release()
+                token.raise_if_cancelled()
+            if not is_retryable(e):
+                # Upstream answered (e.g. bad key) - it is alive
+                if breaker:
+                    breaker.record_success()
+                raise
+            if breaker:
+                breaker.record_failure()
+            last_error = e
+
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            if attempt == attempts - 1 or delay >= deadline.remaining():
+                break
+            print(f"[RETRY] Attempt {attempt + 1} failed ({type(e).__name__}), retry in {delay:.2f}s")
+            if token:
+                token.wait(delay)
+            else:
+                time.sleep(delay)
+            continue
+
+        if breaker:
+            breaker.record_success()
+        return result
+
+    if last_error:
+        raise last_error
+    raise DeadlineExceeded(f"No attempt finished within {deadline.seconds:.1f}s")
+
+
+# Breakers by upstream name ("groq", "supabase")
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name):
+    """Get or create the circuit breaker for an upstream."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_stats():
+    """State of all breakers (for debug output / analytics)."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.stats() for b in breakers}
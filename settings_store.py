@@ -0,0 +1,132 @@
+"""
+VTT Settings store
+settings.json with write-behind: saves are coalesced on a background
+writer and every write is atomic (temp file + fsync + rename).
+"""
+import json
+import os
+import threading
+import time
+
+SETTINGS_FILE = "settings.json"
+WRITE_INTERVAL = 0.5  # At most one disk write per this many seconds
+
+
+class SettingsStore:
+    """Loads settings once and persists snapshots of them in the background.
+
+    save() only records the latest snapshot and returns immediately, so
+    toggling a checkbox never touches the disk on the UI thread.
+    """
+
+    def __init__(self, path=SETTINGS_FILE, defaults=None, interval=WRITE_INTERVAL):
+        self.path = path
+        self.defaults = dict(defaults or {})
+        self.interval = interval
+        self.saves = 0
+        self.writes = 0
+        self._pending = None
+        self._last_write = 0.0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # Writer thread vs flush()
+        self._writer = None
+
+    def load(self):
+        """Defaults overlaid with the file (read exactly once at startup)."""
+        settings = dict(self.defaults)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                settings.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # Keep the broken file for inspection instead of overwriting it silently
+            print(f"[ERROR] Settings unreadable, using defaults: {e}")
+            try:
+                os.replace(self.path, self.path + ".corrupt")
+            except OSError:
+                pass
+        return settings
+
+    def save(self, settings):
+        """Schedule a write of the current settings (non-blocking)."""
+        snapshot = dict(settings)
+        with self._cond:
+            if self._closed:
+                return
+            self._pending = snapshot
+            self.saves += 1
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, daemon=True)
+                self._writer.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Coalesce: everything saved during the wait ends up in one write
+                wait = self._last_write + self.interval - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._write_lock:
+            with self._cond:
+                snapshot, self._pending = self._pending, None
+            if snapshot is None:
+                return
+            try:
+                self._write(snapshot)
+            except Exception as e:
+                print(f"[ERROR] Settings save: {e}")
+            self._last_write = time.monotonic()
+
+    def _write(self, settings):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        # Readers see either the old or the new file, never a half-written one
+        os.replace(tmp, self.path)
+        self.writes += 1
+
+    def flush(self):
+        """Write pending changes now (blocking)."""
+        self._write_pending()
+
+    def close(self):
+        """Flush and stop the writer (on app exit)."""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        print(f"[SETTINGS] {self.saves} saves -> {self.writes} writes")
+
+
+if __name__ == "__main__":
+    # Benchmark: 1000 rapid saves (like dragging through options) -> few writes
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "settings.json")
+    store = SettingsStore(path, {"sounds": True, "hotkey": "F9"})
+    settings = store.load()
+
+    start = time.perf_counter()
+    for i in range(1000):
+        settings["sounds"] = not settings["sounds"]
+        settings["counter"] = i
+        store.save(settings)
+        time.sleep(0.001)
+    per_save = (time.perf_counter() - start) / 1000 * 1e6
+    store.close()
+
+    print(f"save(): {per_save:.0f} us per call incl. 1 ms sleep")
+    print(f"Reloaded counter: {SettingsStore(path).load()['counter']}")
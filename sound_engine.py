@@ -0,0 +1,245 @@
+"""
+VTT Sound engine
+UI cues are rendered once into float32 buffers and mixed into one
+persistent output stream, so a play is a slot assignment: no synthesis,
+no thread and no new stream per sound. The stream is opened and started
+on a helper thread, never on the caller's (Tk) thread, and stays running
+for the whole recording session.
+"""
+import statistics
+import threading
+import time
+from collections import deque
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+sd = lazy_import("sounddevice")
+
+SAMPLE_RATE = 44100
+MAX_VOICES = 4      # Cues that may overlap; more are dropped
+IDLE_STOP = 3.0     # Seconds of silence before the stream stops, outside recording
+
+# name -> (frequencies, tone seconds, volume, gap seconds)
+CUES = {
+    "start": ([523, 659, 784], 0.08, 0.25, 0.02),    # Rising chime C5 -> E5 -> G5
+    "stop": ([784, 659], 0.06, 0.2, 0.015),          # Falling G5 -> E5
+    "success": ([880, 1047, 1319], 0.07, 0.2, 0.02),  # Like iPhone payment success
+}
+
+
+def render_tone(freq, duration, volume=0.3, fade=True, samplerate=SAMPLE_RATE):
+    """Smooth sine tone as float32."""
+    t = np.linspace(0, duration, int(samplerate * duration), False)
+    tone = np.sin(2 * np.pi * freq * t) * volume
+
+    if fade:
+        # Smooth fade in/out
+        fade_len = int(len(tone) * 0.15)
+        tone[:fade_len] *= np.linspace(0, 1, fade_len)
+        tone[-fade_len:] *= np.linspace(1, 0, fade_len)
+
+    return tone.astype(np.float32)
+
+
+def render_cue(freqs, duration, volume, gap, samplerate=SAMPLE_RATE):
+    silence = np.zeros(int(samplerate * gap), dtype=np.float32)
+    parts = []
+    for freq in freqs:
+        parts.append(render_tone(freq, duration, volume, samplerate=samplerate))
+        parts.append(silence)
+    return np.concatenate(parts)
+
+
+class SoundEngine:
+    """Fixed voice slots mixed by the output stream callback."""
+
+    def __init__(self, cues=CUES, samplerate=SAMPLE_RATE, voices=MAX_VOICES, idle_stop=IDLE_STOP):
+        self.cues = cues
+        self.samplerate = samplerate
+        self.idle_stop = idle_stop
+        self.bank = {}
+        self._slots = [[None, 0, 0.0, None] for _ in range(voices)]  # buffer, pos, requested, since
+        self._lock = threading.Lock()
+        self._stream = None
+        self._silent_frames = 0
+        self._stopping = False
+        self._recording = False  # No idle stop while set
+        self._wake = threading.Event()
+        self._worker = None
+        self._closed = False
+
+        # Stats
+        self.plays = 0
+        self.dropped = 0
+        self.stream_opens = 0
+        self._latency = deque(maxlen=200)         # play() -> DAC
+        self._hotkey_latency = deque(maxlen=200)  # caller's timestamp (hotkey) -> DAC
+
+    def render(self):
+        """Render every cue once (startup worker). Later calls are no-ops."""
+        if not self.bank:
+            self.bank = {name: render_cue(*spec, samplerate=self.samplerate)
+                         for name, spec in self.cues.items()}
+        return self.bank
+
+    def prepare(self):
+        """Render cues and open the stream (startup worker); it starts on first use."""
+        self.render()
+        try:
+            self._open()
+        except Exception as e:
+            print(f"[SOUND] Output stream: {e}")
+
+    def play(self, name, since=None):
+        """Queue cue `name`. `since` = perf_counter() of the triggering input, if known.
+
+        Never touches the audio device: a stopped stream is started by the
+        helper thread and the cue plays from its first callback.
+        """
+        buffer = self.render().get(name)
+        if buffer is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            slot = next((s for s in self._slots if s[0] is None), None)
+            if slot is None:
+                self.dropped += 1
+                return
+            slot[1], slot[2], slot[3] = 0, now, since
+            slot[0] = buffer
+            self.plays += 1
+        self._request_start()
+
+    def set_recording(self, active):
+        """Keep the stream running for a recording session, so its cues don't
+        wait for a device start. Outside recording it stops when idle."""
+        with self._lock:
+            self._recording = active
+            self._silent_frames = 0
+        if active:
+            self._request_start()
+
+    def _request_start(self):
+        stream = self._stream
+        if stream is not None and stream.active and not self._stopping:
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True, name="sound-stream")
+            self._worker.start()
+        self._wake.set()
+
+    def _run(self):
+        # Helper thread: the only place the stream is opened and started
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                self._ensure_running()
+            except Exception as e:
+                print(f"[SOUND] Output stream: {e}")
+                with self._lock:
+                    for slot in self._slots:
+                        slot[0] = None
+
+    def _open(self):
+        if self._stream is None:
+            self._stream = sd.OutputStream(
+                samplerate=self.samplerate, channels=1, dtype="float32",
+                latency="low", callback=self._callback,
+            )
+            self.stream_opens += 1
+        return self._stream
+
+    def _ensure_running(self):
+        stream = self._open()
+        if self._stopping or not stream.active:
+            if not stream.stopped:
+                # Callback ended it after an idle period
+                stream.stop()
+            with self._lock:
+                self._stopping = False
+                self._silent_frames = 0
+            stream.start()
+
+    def _callback(self, outdata, frames, times, status):
+        # PortAudio thread: mix into outdata in place, no allocations
+        outdata.fill(0)
+        mixed = False
+        now = None
+        with self._lock:
+            for slot in self._slots:
+                buffer = slot[0]
+                if buffer is None:
+                    continue
+                pos = slot[1]
+                if pos == 0:
+                    now = now or time.perf_counter()
+                    # Time until these samples actually leave the DAC
+                    ahead = max(0.0, times.outputBufferDacTime - times.currentTime)
+                    self._latency.append(now - slot[2] + ahead)
+                    if slot[3] is not None:
+                        self._hotkey_latency.append(now - slot[3] + ahead)
+                count = min(frames, len(buffer) - pos)
+                outdata[:count, 0] += buffer[pos:pos + count]
+                slot[1] = pos + count
+                if slot[1] >= len(buffer):
+                    slot[0] = None
+                mixed = True
+            if not mixed:
+                self._silent_frames += frames
+                # Decided under the lock, so a play() racing with it sees the flag
+                self._stopping = (not self._recording and
+                                  self._silent_frames > self.idle_stop * self.samplerate)
+        if mixed:
+            np.clip(outdata, -1.0, 1.0, out=outdata)
+            self._silent_frames = 0
+        elif self._stopping:
+            raise sd.CallbackStop
+
+    def stats(self):
+        def summary(values):
+            values = sorted(values)
+            if not values:
+                return {"avg": 0, "p95": 0, "max": 0}
+            return {
+                "avg": round(statistics.fmean(values) * 1000, 1),
+                "p95": round(values[int(len(values) * 0.95)] * 1000, 1),
+                "max": round(values[-1] * 1000, 1),
+            }
+        return {
+            "plays": self.plays,
+            "dropped": self.dropped,
+            "stream_opens": self.stream_opens,
+            "latency_ms": summary(self._latency),
+            "hotkey_latency_ms": summary(self._hotkey_latency),
+        }
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+
+
+def benchmark_latency(rounds=10):
+    """play() -> DAC latency on the default output device."""
+    engine = SoundEngine()
+    started = time.perf_counter()
+    engine.prepare()
+    print(f"Rendered {len(engine.bank)} cues in {(time.perf_counter() - started) * 1000:.1f} ms")
+    for i in range(rounds):
+        engine.play(list(engine.cues)[i % len(engine.cues)])
+        time.sleep(0.4)
+    print(engine.stats())
+    engine.close()
+
+
+if __name__ == "__main__":
+    benchmark_latency()
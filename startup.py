@@ -0,0 +1,142 @@
+"""
+VTT Startup
+Runs initialization tasks as a dependency graph: independent work goes to
+background threads, Tk work runs on the main loop as soon as its inputs
+are ready. Progress comes from real task completion, not fixed delays.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StartupTask:
+    __slots__ = ("name", "fn", "after", "main", "status_key",
+                 "state", "result", "error", "started", "finished")
+
+    def __init__(self, name, fn, after=(), main=False, status_key=None):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+        self.main = main            # Must run on the Tk thread
+        self.status_key = status_key  # Splash text while/after it runs
+        self.state = "pending"      # pending -> running -> done
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self):
+        return (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+
+
+class StartupOrchestrator:
+    """Dependency-ordered startup with a background pool and a report.
+
+    `post(fn, *args)` must run fn on the Tk thread (UIDispatcher.post).
+    A failed task still counts as finished; dependents see result None.
+    """
+
+    def __init__(self, root, post, workers=4):
+        self.root = root
+        self.post = post
+        self.tasks = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="startup")
+        self._ready_after = ()
+        self._on_progress = None
+        self._on_ready = None
+        self._on_done = None
+        self.started = None
+        self.ready_at = None
+        self.done_at = None
+
+    def add(self, name, fn, after=(), main=False, status_key=None):
+        self.tasks[name] = StartupTask(name, fn, after, main, status_key)
+
+    def result(self, name):
+        return self.tasks[name].result
+
+    def run(self, on_progress=None, ready_after=(), on_ready=None, on_done=None):
+        """Start everything that has no dependencies.
+
+        on_progress(done, total, task) after each task, on_ready() once all
+        `ready_after` tasks finished, on_done(report) at the very end.
+        All callbacks run on the Tk thread.
+        """
+        self._on_progress = on_progress
+        self._ready_after = tuple(ready_after)
+        self._on_ready = on_ready
+        self._on_done = on_done
+        self.started = time.perf_counter()
+        self._start_runnable()
+
+    def _start_runnable(self):
+        for task in self.tasks.values():
+            if task.state != "pending":
+                continue
+            if all(self.tasks[dep].state == "done" for dep in task.after):
+                task.state = "running"
+                if task.main:
+                    self.root.after(0, self._execute, task)
+                else:
+                    self._pool.submit(self._execute, task)
+
+    def _execute(self, task):
+        task.started = time.perf_counter()
+        try:
+            task.result = task.fn()
+        except Exception as e:
+            task.error = e
+            print(f"[STARTUP] {task.name} failed: {e}")
+        task.finished = time.perf_counter()
+        if task.main:
+            self._complete(task)
+        else:
+            self.post(self._complete, task)
+
+    def _complete(self, task):
+        # Tk thread
+        task.state = "done"
+        done = sum(1 for t in self.tasks.values() if t.state == "done")
+        if self._on_progress:
+            self._on_progress(done, len(self.tasks), task)
+
+        if self.ready_at is None and all(self.tasks[name].state == "done" for name in self._ready_after):
+            self.ready_at = time.perf_counter()
+            if self._on_ready:
+                self._on_ready()
+
+        self._start_runnable()
+        if done == len(self.tasks) and self.done_at is None:
+            self.done_at = time.perf_counter()
+            self._pool.shutdown(wait=False)
+            if self._on_done:
+                self._on_done(self.report())
+
+    def report(self):
+        """Per-task timings in ms, relative to run()."""
+        def ms(t):
+            return round((t - self.started) * 1000, 1) if t else None
+        return {
+            "ready_ms": ms(self.ready_at),
+            "done_ms": ms(self.done_at),
+            "tasks": [
+                {
+                    "name": task.name,
+                    "thread": "main" if task.main else "worker",
+                    "start_ms": ms(task.started),
+                    "duration_ms": round(task.duration * 1000, 1),
+                    "error": str(task.error) if task.error else None,
+                }
+                for task in sorted(self.tasks.values(), key=lambda t: t.started or 0)
+            ],
+        }
+
+
+def format_report(report):
+    """Startup report as printable lines."""
+    lines = [f"[STARTUP] Window ready in {report['ready_ms']} ms, all done in {report['done_ms']} ms"]
+    for task in report["tasks"]:
+        error = f"  ERROR: {task['error']}" if task["error"] else ""
+        lines.append(f"[STARTUP]   {task['name']:<10} {task['thread']:<6} "
+                     f"+{task['start_ms']:>7} ms  {task['duration_ms']:>7} ms{error}")
+    return "\n".join(lines)
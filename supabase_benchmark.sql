@@ -0,0 +1,149 @@
+-- VTT Analytics benchmark (локальный Postgres 14+, НЕ продакшен)
+-- Заполняет схему синтетическими данными и сравнивает запросы дашборда
+-- по сырым событиям с запросами по дневным агрегатам.
+--
+--   createdb vtt_bench
+--   psql -d vtt_bench -f supabase_benchmark.sql                  -- 100M событий
+--   psql -d vtt_bench -v events=1000000 -f supabase_benchmark.sql -- быстрый прогон
+--
+-- На 100M нужно ~40 ГБ диска и около часа на заполнение.
+
+\set ON_ERROR_STOP on
+\if :{?events}
+\else
+\set events 100000000
+\endif
+\set devices 50000
+
+-- Роль anon есть только в Supabase; политики её не упоминают, так что схема ставится как есть
+\i supabase_schema.sql
+
+-- Синтетика: 180 дней, перекос по устройствам (активные шлют больше),
+-- типы событий с реальными пропорциями (recording_complete выводится из
+-- vtt_recordings). Пачки по 1M строк с COMMIT, чтобы триггеры агрегатов
+-- отрабатывали на пачке, как на пакете клиента.
+CREATE OR REPLACE PROCEDURE vtt_bench_fill(p_events BIGINT, p_devices INT, p_days INT DEFAULT 180)
+LANGUAGE plpgsql AS $$
+DECLARE
+    chunk CONSTANT BIGINT := 1000000;
+    done BIGINT := 0;
+    n BIGINT;
+BEGIN
+    PERFORM vtt_ensure_event_partitions((NOW() - make_interval(days => p_days))::DATE);
+
+    INSERT INTO vtt_installs (device_id, os, app_version, first_seen, last_seen, is_premium)
+    SELECT 'dev-' || i, 'windows', '1.0.0',
+           NOW() - make_interval(days => p_days) * random(),
+           NOW() - make_interval(days => 30) * random() ^ 3,
+           random() < 0.05
+    FROM generate_series(1, p_devices) i;
+
+    INSERT INTO vtt_downloads (platform, version, source, created_at)
+    SELECT 'windows', '1.0.0', 'github', NOW() - make_interval(days => p_days) * random()
+    FROM generate_series(1, p_devices * 2);
+    COMMIT;
+
+    WHILE done < p_events LOOP
+        n := LEAST(chunk, p_events - done);
+        INSERT INTO vtt_events (device_id, event_type, event_data, app_version, created_at, event_id)
+        SELECT 'dev-' || (1 + floor(p_devices * random() ^ 2))::INT,
+               (ARRAY['app_launch', 'recording_start', 'recording_start', 'recording_start',
+                      'hotkey_used', 'hotkey_used', 'settings_changed', 'ai_brain_used',
+                      'transcription_error', 'app_close'])[1 + floor(random() * 10)::INT],
+               NULL, '1.0.0',
+               NOW() - make_interval(days => p_days) * random(),
+               gen_random_uuid()
+        FROM generate_series(1, n);
+
+        INSERT INTO vtt_recordings (device_id, duration_seconds, text_length, language, created_at, event_id)
+        SELECT 'dev-' || (1 + floor(p_devices * random() ^ 2))::INT,
+               random() * 120, (random() * 800)::INT, 'ru',
+               NOW() - make_interval(days => p_days) * random(),
+               gen_random_uuid()
+        FROM generate_series(1, n / 5);
+
+        done := done + n;
+        COMMIT;
+        RAISE NOTICE 'vtt_bench_fill: % / % events', done, p_events;
+    END LOOP;
+END;
+$$;
+
+\timing on
+CALL vtt_bench_fill(:events, :devices);
+ANALYZE;
+
+-- Прежние запросы дашборда: полный пересчёт по сырым строкам
+CREATE OR REPLACE VIEW vtt_bench_old_stats AS
+SELECT
+    (SELECT COUNT(*) FROM vtt_installs) as total_installs,
+    (SELECT COUNT(*) FROM vtt_installs WHERE last_seen > NOW() - INTERVAL '24 hours') as active_today,
+    (SELECT COUNT(*) FROM vtt_installs WHERE last_seen > NOW() - INTERVAL '7 days') as active_week,
+    (SELECT COUNT(*) FROM vtt_recordings WHERE NOT rolled_up) as total_recordings,
+    (SELECT COUNT(*) FROM vtt_recordings WHERE NOT rolled_up AND created_at > NOW() - INTERVAL '24 hours') as recordings_today,
+    (SELECT COUNT(*) FROM vtt_installs WHERE is_premium = true) as premium_users,
+    (SELECT COUNT(*) FROM vtt_downloads) as total_downloads;
+
+CREATE OR REPLACE VIEW vtt_bench_old_counts_daily AS
+SELECT DATE(created_at) as date, event_type, COUNT(*) as count, COUNT(DISTINCT device_id) as unique_users
+FROM vtt_events
+WHERE created_at > NOW() - INTERVAL '30 days'
+GROUP BY DATE(created_at), event_type;
+
+CREATE OR REPLACE VIEW vtt_bench_old_daily_stats AS
+SELECT DATE(created_at) as date, COUNT(*) as events, COUNT(DISTINCT device_id) as unique_users
+FROM vtt_events
+WHERE created_at > NOW() - INTERVAL '30 days'
+GROUP BY DATE(created_at)
+ORDER BY date DESC;
+
+CREATE OR REPLACE VIEW vtt_bench_old_event_stats AS
+SELECT event_type, COUNT(*) as count, COUNT(DISTINCT device_id) as unique_users
+FROM vtt_events
+WHERE created_at > NOW() - INTERVAL '7 days'
+GROUP BY event_type
+ORDER BY count DESC;
+
+\echo '=== vtt_stats: raw vs aggregates ==='
+SELECT * FROM vtt_bench_old_stats;
+SELECT * FROM vtt_stats;
+
+\echo '=== vtt_daily_stats: raw vs aggregates ==='
+-- unique_users в выборке, иначе планировщик выбрасывает его подзапрос
+SELECT COUNT(*), SUM(events), SUM(unique_users) FROM vtt_bench_old_daily_stats;
+SELECT COUNT(*), SUM(events), SUM(unique_users) FROM vtt_daily_stats;
+
+\echo '=== vtt_event_stats: raw vs aggregates ==='
+SELECT * FROM vtt_bench_old_event_stats;
+SELECT * FROM vtt_event_stats;
+
+\echo '=== vtt_event_counts_daily (dashboard counters, 7 days): raw vs aggregates ==='
+SELECT COUNT(*), SUM(count), SUM(unique_users) FROM vtt_bench_old_counts_daily WHERE date >= CURRENT_DATE - 7;
+SELECT COUNT(*), SUM(count), SUM(unique_users) FROM vtt_event_counts_daily WHERE date >= CURRENT_DATE - 7;
+
+\echo '=== Dashboard: recent events feed ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT * FROM vtt_events WHERE created_at >= CURRENT_DATE - 7 ORDER BY created_at DESC LIMIT 100;
+
+\echo '=== Per-device history (idx_events_device_created) ==='
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+SELECT event_type, created_at FROM vtt_events
+WHERE device_id = 'dev-1' AND created_at > NOW() - INTERVAL '30 days'
+ORDER BY created_at DESC LIMIT 100;
+
+-- Цена триггеров на типичном пакете клиента (50 строк, BATCH_SIZE)
+\echo '=== Insert of one client batch (50 rows, triggers included) ==='
+BEGIN;
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO vtt_events (device_id, event_type, app_version, created_at, event_id)
+SELECT 'dev-' || (1 + floor(:devices * random()))::INT, 'app_launch', '1.0.0', NOW(), gen_random_uuid()
+FROM generate_series(1, 50)
+ON CONFLICT (event_id, created_at) DO NOTHING;
+ROLLBACK;
+
+\echo '=== Sizes ==='
+SELECT relname, pg_size_pretty(pg_total_relation_size(oid)) AS size
+FROM pg_class
+WHERE relname IN ('vtt_event_daily', 'vtt_event_daily_devices', 'vtt_recordings_daily', 'vtt_recordings', 'vtt_installs')
+   OR (relname LIKE 'vtt_events_%' AND relkind = 'r')
+ORDER BY pg_total_relation_size(oid) DESC;
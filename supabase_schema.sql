@@ -17,15 +17,19 @@ CREATE TABLE IF NOT EXISTS vtt_installs (
     license_key TEXT
 );
 
--- 2. События (все действия пользователей)
+-- 2. События (все действия пользователей), партиции по месяцам created_at
+-- (см. vtt_ensure_event_partitions ниже)
 CREATE TABLE IF NOT EXISTS vtt_events (
-    id BIGSERIAL PRIMARY KEY,
+    id BIGSERIAL,
     device_id TEXT NOT NULL,
     event_type TEXT NOT NULL,         -- app_launch, recording_start, recording_complete, etc.
     event_data JSONB,                 -- Дополнительные данные
     app_version TEXT,
-    created_at TIMESTAMPTZ DEFAULT NOW()
-);
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    event_id UUID,
+    rolled_up BOOLEAN DEFAULT FALSE,
+    PRIMARY KEY (id, created_at)      -- Ключ партиционирования входит во все уникальные индексы
+) PARTITION BY RANGE (created_at);
 
 -- 3. Записи (статистика транскрибаций)
 CREATE TABLE IF NOT EXISTS vtt_recordings (
@@ -64,12 +68,119 @@ CREATE TABLE IF NOT EXISTS vtt_errors (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
--- Индексы для быстрых запросов
-CREATE INDEX IF NOT EXISTS idx_events_device ON vtt_events(device_id);
-CREATE INDEX IF NOT EXISTS idx_events_type ON vtt_events(event_type);
-CREATE INDEX IF NOT EXISTS idx_events_created ON vtt_events(created_at);
+-- Ключи идемпотентности: клиент хранит события в локальном спуле и может
+-- отправить их повторно (at-least-once). Дубликаты отбрасываются по event_id,
+-- created_at приходит с клиента (время события, а не отправки)
+ALTER TABLE vtt_events ADD COLUMN IF NOT EXISTS event_id UUID;
+ALTER TABLE vtt_recordings ADD COLUMN IF NOT EXISTS event_id UUID;
+ALTER TABLE vtt_errors ADD COLUMN IF NOT EXISTS event_id UUID;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_recordings_event_id ON vtt_recordings(event_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_errors_event_id ON vtt_errors(event_id);
+
+-- Группировка ошибок: клиент считает отпечаток (тип + нормализованное
+-- сообщение + верхние кадры стека), полный текст шлёт один раз, дальше
+-- только счётчики. Одна строка на ошибку, устройство и день.
+ALTER TABLE vtt_errors ADD COLUMN IF NOT EXISTS fingerprint TEXT;
+ALTER TABLE vtt_errors ADD COLUMN IF NOT EXISTS occurrences INT DEFAULT 1;
+ALTER TABLE vtt_errors ADD COLUMN IF NOT EXISTS window_start DATE;
+ALTER TABLE vtt_errors ADD COLUMN IF NOT EXISTS last_seen TIMESTAMPTZ DEFAULT NOW();
+CREATE UNIQUE INDEX IF NOT EXISTS uq_errors_fingerprint ON vtt_errors(device_id, fingerprint, window_start);
+
+-- 6. Сводки (rollups): частые события клиент агрегирует сам и присылает
+-- одну строку на устройство за окно (час) вместо строки на каждое событие
+CREATE TABLE IF NOT EXISTS vtt_rollups (
+    id BIGSERIAL PRIMARY KEY,
+    event_id UUID UNIQUE,
+    device_id TEXT NOT NULL,
+    app_version TEXT,
+    window_start TIMESTAMPTZ NOT NULL,
+    window_end TIMESTAMPTZ NOT NULL,
+    counts JSONB,                     -- {"recording_start": 12, "settings_changed:sounds": 1, ...}
+    recordings INT DEFAULT 0,
+    recordings_failed INT DEFAULT 0,
+    ai_brain INT DEFAULT 0,
+    duration_sum FLOAT DEFAULT 0,     -- Секунды записи
+    duration_hist JSONB,              -- Счётчики по корзинам <=5, <=15, <=30, <=60, <=120, >120 с
+    text_length_sum BIGINT DEFAULT 0,
+    languages JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_rollups_window ON vtt_rollups(window_start);
+CREATE INDEX IF NOT EXISTS idx_rollups_device ON vtt_rollups(device_id);
+
+-- Сырые строки событий, уже учтённые в vtt_rollups (отладочная выборка)
+ALTER TABLE vtt_events ADD COLUMN IF NOT EXISTS rolled_up BOOLEAN DEFAULT FALSE;
+ALTER TABLE vtt_recordings ADD COLUMN IF NOT EXISTS rolled_up BOOLEAN DEFAULT FALSE;
+
+-- Партиции vtt_events: одна на месяц + DEFAULT для событий с неверными часами клиента.
+-- Создаёт недостающие партиции от p_from до текущего месяца + p_months_ahead.
+-- Запускать раз в месяц (например, pg_cron:
+--   SELECT cron.schedule('vtt-partitions', '0 0 1 * *', 'SELECT vtt_ensure_event_partitions()');)
+-- Заранее созданные партиции нужны и потому, что новую партицию нельзя
+-- создать, если DEFAULT уже содержит строки её диапазона.
+CREATE OR REPLACE FUNCTION vtt_ensure_event_partitions(p_from DATE DEFAULT CURRENT_DATE, p_months_ahead INT DEFAULT 3)
+RETURNS void AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_from)::DATE;
+    last_month DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead))::DATE;
+BEGIN
+    EXECUTE 'CREATE TABLE IF NOT EXISTS vtt_events_default PARTITION OF vtt_events DEFAULT';
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF vtt_events FOR VALUES FROM (%L) TO (%L)',
+            'vtt_events_' || to_char(month_start, 'YYYY_MM'),
+            month_start, (month_start + INTERVAL '1 month')::DATE
+        );
+        month_start := (month_start + INTERVAL '1 month')::DATE;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Миграция: старая непартиционированная vtt_events переносится в партиционированную.
+-- Старая таблица остаётся как vtt_events_legacy - удалить вручную после проверки.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'vtt_events' AND relkind = 'r') THEN
+        ALTER TABLE vtt_events RENAME TO vtt_events_legacy;
+        ALTER TABLE vtt_events_legacy RENAME CONSTRAINT vtt_events_pkey TO vtt_events_legacy_pkey;
+        -- Имена индексов нужны новой таблице
+        DROP INDEX IF EXISTS uq_events_event_id, idx_events_device, idx_events_type, idx_events_created;
+
+        -- INCLUDING DEFAULTS: id продолжает ту же последовательность
+        CREATE TABLE vtt_events (LIKE vtt_events_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (created_at);
+        ALTER TABLE vtt_events ALTER COLUMN created_at SET NOT NULL;
+        ALTER TABLE vtt_events ADD PRIMARY KEY (id, created_at);
+        ALTER SEQUENCE vtt_events_id_seq OWNED BY vtt_events.id;
+        -- Политика осталась на vtt_events_legacy: без неё вставки anon отклоняются
+        ALTER TABLE vtt_events ENABLE ROW LEVEL SECURITY;
+        CREATE POLICY "Allow all for vtt_events" ON vtt_events FOR ALL USING (true) WITH CHECK (true);
+
+        PERFORM vtt_ensure_event_partitions(COALESCE((SELECT MIN(created_at) FROM vtt_events_legacy)::DATE, CURRENT_DATE));
+        INSERT INTO vtt_events (id, device_id, event_type, event_data, app_version, created_at, event_id, rolled_up)
+        SELECT id, device_id, event_type, event_data, app_version, COALESCE(created_at, NOW()), event_id, rolled_up
+        FROM vtt_events_legacy;
+    END IF;
+END $$;
+
+SELECT vtt_ensure_event_partitions();
+
+-- Обработанные вызовы RPC (для идемпотентности track_session)
+CREATE TABLE IF NOT EXISTS vtt_ingested (
+    event_id UUID PRIMARY KEY,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Индексы для быстрых запросов (на партиционированной таблице - в каждой партиции)
+-- Повтор из спула отсекается по (event_id, created_at): created_at задаёт клиент
+CREATE UNIQUE INDEX IF NOT EXISTS uq_events_event_id ON vtt_events(event_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_events_created ON vtt_events(created_at);                  -- Лента последних событий
+CREATE INDEX IF NOT EXISTS idx_events_type_created ON vtt_events(event_type, created_at);
+CREATE INDEX IF NOT EXISTS idx_events_device_created ON vtt_events(device_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_recordings_device ON vtt_recordings(device_id);
+CREATE INDEX IF NOT EXISTS idx_recordings_created ON vtt_recordings(created_at);
 CREATE INDEX IF NOT EXISTS idx_installs_device ON vtt_installs(device_id);
+CREATE INDEX IF NOT EXISTS idx_installs_last_seen ON vtt_installs(last_seen);
+CREATE INDEX IF NOT EXISTS idx_installs_premium ON vtt_installs(device_id) WHERE is_premium;
 
 -- RLS (Row Level Security) - отключаем для простоты, включим потом
 ALTER TABLE vtt_installs ENABLE ROW LEVEL SECURITY;
@@ -77,53 +188,318 @@ ALTER TABLE vtt_events ENABLE ROW LEVEL SECURITY;
 ALTER TABLE vtt_recordings ENABLE ROW LEVEL SECURITY;
 ALTER TABLE vtt_downloads ENABLE ROW LEVEL SECURITY;
 ALTER TABLE vtt_errors ENABLE ROW LEVEL SECURITY;
+ALTER TABLE vtt_ingested ENABLE ROW LEVEL SECURITY;
+ALTER TABLE vtt_rollups ENABLE ROW LEVEL SECURITY;
 
--- Политики: разрешаем всё для anon (приложение отправляет без авторизации)
+-- Политики: разрешаем всё для anon (приложение отправляет без авторизации).
+-- DROP + CREATE, чтобы файл можно было запускать повторно
+DROP POLICY IF EXISTS "Allow all for vtt_installs" ON vtt_installs;
 CREATE POLICY "Allow all for vtt_installs" ON vtt_installs FOR ALL USING (true) WITH CHECK (true);
+DROP POLICY IF EXISTS "Allow all for vtt_events" ON vtt_events;
 CREATE POLICY "Allow all for vtt_events" ON vtt_events FOR ALL USING (true) WITH CHECK (true);
+DROP POLICY IF EXISTS "Allow all for vtt_recordings" ON vtt_recordings;
 CREATE POLICY "Allow all for vtt_recordings" ON vtt_recordings FOR ALL USING (true) WITH CHECK (true);
+DROP POLICY IF EXISTS "Allow all for vtt_downloads" ON vtt_downloads;
 CREATE POLICY "Allow all for vtt_downloads" ON vtt_downloads FOR ALL USING (true) WITH CHECK (true);
+DROP POLICY IF EXISTS "Allow all for vtt_errors" ON vtt_errors;
 CREATE POLICY "Allow all for vtt_errors" ON vtt_errors FOR ALL USING (true) WITH CHECK (true);
+DROP POLICY IF EXISTS "Allow all for vtt_rollups" ON vtt_rollups;
+CREATE POLICY "Allow all for vtt_rollups" ON vtt_rollups FOR ALL USING (true) WITH CHECK (true);
 
--- Вьюхи для дашборда
+-- 7. Дневные агрегаты для дашборда. Ведутся триггерами при вставке, поэтому
+-- запросы дашборда стоят O(дней), а не O(событий). Даты - в UTC.
+CREATE TABLE IF NOT EXISTS vtt_event_daily (
+    date DATE NOT NULL,
+    event_type TEXT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (date, event_type)
+);
+-- Уникальные устройства за день по типу (ведёт триггер на vtt_event_daily_devices)
+ALTER TABLE vtt_event_daily ADD COLUMN IF NOT EXISTS users BIGINT NOT NULL DEFAULT 0;
+
+-- Кто был активен: для уникальных пользователей по дням и типам событий
+CREATE TABLE IF NOT EXISTS vtt_event_daily_devices (
+    date DATE NOT NULL,
+    event_type TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    PRIMARY KEY (date, event_type, device_id)
+);
+CREATE INDEX IF NOT EXISTS idx_event_daily_devices_type ON vtt_event_daily_devices(event_type, date);
+
+CREATE TABLE IF NOT EXISTS vtt_recordings_daily (
+    date DATE PRIMARY KEY,
+    recordings BIGINT NOT NULL DEFAULT 0
+);
+
+-- Счётчики вместо COUNT(*) по растущим таблицам
+CREATE TABLE IF NOT EXISTS vtt_counters (
+    name TEXT PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+ALTER TABLE vtt_event_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE vtt_event_daily_devices ENABLE ROW LEVEL SECURITY;
+ALTER TABLE vtt_recordings_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE vtt_counters ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Read vtt_event_daily" ON vtt_event_daily;
+CREATE POLICY "Read vtt_event_daily" ON vtt_event_daily FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Read vtt_recordings_daily" ON vtt_recordings_daily;
+CREATE POLICY "Read vtt_recordings_daily" ON vtt_recordings_daily FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Read vtt_counters" ON vtt_counters;
+CREATE POLICY "Read vtt_counters" ON vtt_counters FOR SELECT USING (true);
+
+-- Триггеры уровня оператора: одна агрегация на пакетную вставку клиента.
+-- В переходную таблицу попадают только реально вставленные строки, так что
+-- отброшенные повторы (ON CONFLICT DO NOTHING) не считаются.
+-- recording_complete выводится из записей (vtt_recordings и recordings в
+-- сводках): клиент не шлёт отдельное событие. Такие события от старых
+-- версий пропускаются, чтобы не считать их дважды.
+CREATE OR REPLACE FUNCTION vtt_events_to_daily() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO vtt_event_daily (date, event_type, count)
+    SELECT (created_at AT TIME ZONE 'UTC')::DATE, event_type, COUNT(*)
+    FROM new_rows
+    WHERE NOT COALESCE(rolled_up, FALSE) AND event_type <> 'recording_complete'
+    GROUP BY 1, 2
+    ON CONFLICT (date, event_type) DO UPDATE SET count = vtt_event_daily.count + EXCLUDED.count;
+
+    INSERT INTO vtt_event_daily_devices (date, event_type, device_id)
+    SELECT DISTINCT (created_at AT TIME ZONE 'UTC')::DATE, event_type, device_id
+    FROM new_rows
+    WHERE NOT COALESCE(rolled_up, FALSE) AND event_type <> 'recording_complete'
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION vtt_rollups_to_daily() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO vtt_event_daily (date, event_type, count)
+    SELECT date, event_type, SUM(count) FROM (
+        SELECT (r.window_start AT TIME ZONE 'UTC')::DATE AS date, split_part(c.key, ':', 1) AS event_type,
+               c.value::BIGINT AS count
+        FROM new_rows r, jsonb_each_text(r.counts) c
+        WHERE split_part(c.key, ':', 1) <> 'recording_complete'
+        UNION ALL
+        SELECT (window_start AT TIME ZONE 'UTC')::DATE, 'recording_complete', recordings
+        FROM new_rows WHERE recordings > 0
+    ) e
+    GROUP BY date, event_type
+    ON CONFLICT (date, event_type) DO UPDATE SET count = vtt_event_daily.count + EXCLUDED.count;
+
+    INSERT INTO vtt_event_daily_devices (date, event_type, device_id)
+    SELECT (r.window_start AT TIME ZONE 'UTC')::DATE, split_part(c.key, ':', 1), r.device_id
+    FROM new_rows r, jsonb_each_text(r.counts) c
+    WHERE split_part(c.key, ':', 1) <> 'recording_complete'
+    UNION
+    SELECT (window_start AT TIME ZONE 'UTC')::DATE, 'recording_complete', device_id
+    FROM new_rows WHERE recordings > 0
+    ON CONFLICT DO NOTHING;
+
+    INSERT INTO vtt_recordings_daily (date, recordings)
+    SELECT (window_start AT TIME ZONE 'UTC')::DATE, SUM(recordings)
+    FROM new_rows
+    GROUP BY 1
+    HAVING SUM(recordings) > 0
+    ON CONFLICT (date) DO UPDATE SET recordings = vtt_recordings_daily.recordings + EXCLUDED.recordings;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION vtt_recordings_to_daily() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO vtt_recordings_daily (date, recordings)
+    SELECT (created_at AT TIME ZONE 'UTC')::DATE, COUNT(*)
+    FROM new_rows
+    WHERE NOT COALESCE(rolled_up, FALSE)
+    GROUP BY 1
+    ON CONFLICT (date) DO UPDATE SET recordings = vtt_recordings_daily.recordings + EXCLUDED.recordings;
+
+    INSERT INTO vtt_event_daily (date, event_type, count)
+    SELECT (created_at AT TIME ZONE 'UTC')::DATE, 'recording_complete', COUNT(*)
+    FROM new_rows
+    WHERE NOT COALESCE(rolled_up, FALSE)
+    GROUP BY 1
+    ON CONFLICT (date, event_type) DO UPDATE SET count = vtt_event_daily.count + EXCLUDED.count;
+
+    INSERT INTO vtt_event_daily_devices (date, event_type, device_id)
+    SELECT DISTINCT (created_at AT TIME ZONE 'UTC')::DATE, 'recording_complete', device_id
+    FROM new_rows
+    WHERE NOT COALESCE(rolled_up, FALSE)
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Новые устройства дня: в переходную таблицу попадают только строки, которых
+-- ещё не было (ON CONFLICT DO NOTHING), так что users - точное число
+CREATE OR REPLACE FUNCTION vtt_daily_devices_to_users() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO vtt_event_daily (date, event_type, users)
+    SELECT date, event_type, COUNT(*)
+    FROM new_rows
+    GROUP BY 1, 2
+    ON CONFLICT (date, event_type) DO UPDATE SET users = vtt_event_daily.users + EXCLUDED.users;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Счётчик вставок в таблицу: TG_ARGV[0] - имя счётчика
+CREATE OR REPLACE FUNCTION vtt_count_inserts() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO vtt_counters (name, value)
+    SELECT TG_ARGV[0], COUNT(*) FROM new_rows
+    ON CONFLICT (name) DO UPDATE SET value = vtt_counters.value + EXCLUDED.value;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trg_events_daily ON vtt_events;
+CREATE TRIGGER trg_events_daily AFTER INSERT ON vtt_events
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION vtt_events_to_daily();
+DROP TRIGGER IF EXISTS trg_rollups_daily ON vtt_rollups;
+CREATE TRIGGER trg_rollups_daily AFTER INSERT ON vtt_rollups
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION vtt_rollups_to_daily();
+DROP TRIGGER IF EXISTS trg_recordings_daily ON vtt_recordings;
+CREATE TRIGGER trg_recordings_daily AFTER INSERT ON vtt_recordings
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION vtt_recordings_to_daily();
+DROP TRIGGER IF EXISTS trg_installs_count ON vtt_installs;
+CREATE TRIGGER trg_installs_count AFTER INSERT ON vtt_installs
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION vtt_count_inserts('total_installs');
+DROP TRIGGER IF EXISTS trg_downloads_count ON vtt_downloads;
+CREATE TRIGGER trg_downloads_count AFTER INSERT ON vtt_downloads
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION vtt_count_inserts('total_downloads');
+DROP TRIGGER IF EXISTS trg_daily_devices_users ON vtt_event_daily_devices;
+CREATE TRIGGER trg_daily_devices_users AFTER INSERT ON vtt_event_daily_devices
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION vtt_daily_devices_to_users();
+
+-- Первичное заполнение агрегатов из уже накопленных данных (один раз)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM vtt_event_daily) THEN
+        INSERT INTO vtt_event_daily (date, event_type, count)
+        SELECT date, event_type, SUM(count) FROM (
+            SELECT (created_at AT TIME ZONE 'UTC')::DATE AS date, event_type, COUNT(*) AS count
+            FROM vtt_events WHERE NOT COALESCE(rolled_up, FALSE) AND event_type <> 'recording_complete' GROUP BY 1, 2
+            UNION ALL
+            SELECT (r.window_start AT TIME ZONE 'UTC')::DATE, split_part(c.key, ':', 1), SUM(c.value::BIGINT)
+            FROM vtt_rollups r, jsonb_each_text(r.counts) c
+            WHERE split_part(c.key, ':', 1) <> 'recording_complete' GROUP BY 1, 2
+            UNION ALL
+            SELECT (created_at AT TIME ZONE 'UTC')::DATE, 'recording_complete', COUNT(*)
+            FROM vtt_recordings WHERE NOT COALESCE(rolled_up, FALSE) GROUP BY 1
+            UNION ALL
+            SELECT (window_start AT TIME ZONE 'UTC')::DATE, 'recording_complete', SUM(recordings)
+            FROM vtt_rollups WHERE recordings > 0 GROUP BY 1
+        ) e
+        GROUP BY date, event_type;
+
+        INSERT INTO vtt_event_daily_devices (date, event_type, device_id)
+        SELECT (created_at AT TIME ZONE 'UTC')::DATE, event_type, device_id
+        FROM vtt_events WHERE NOT COALESCE(rolled_up, FALSE) AND event_type <> 'recording_complete'
+        UNION
+        SELECT (r.window_start AT TIME ZONE 'UTC')::DATE, split_part(c.key, ':', 1), r.device_id
+        FROM vtt_rollups r, jsonb_each_text(r.counts) c
+        WHERE split_part(c.key, ':', 1) <> 'recording_complete'
+        UNION
+        SELECT (created_at AT TIME ZONE 'UTC')::DATE, 'recording_complete', device_id
+        FROM vtt_recordings WHERE NOT COALESCE(rolled_up, FALSE)
+        UNION
+        SELECT (window_start AT TIME ZONE 'UTC')::DATE, 'recording_complete', device_id
+        FROM vtt_rollups WHERE recordings > 0;
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM vtt_recordings_daily) THEN
+        INSERT INTO vtt_recordings_daily (date, recordings)
+        SELECT date, SUM(recordings) FROM (
+            SELECT (created_at AT TIME ZONE 'UTC')::DATE AS date, COUNT(*) AS recordings
+            FROM vtt_recordings WHERE NOT COALESCE(rolled_up, FALSE) GROUP BY 1
+            UNION ALL
+            SELECT (window_start AT TIME ZONE 'UTC')::DATE, SUM(recordings) FROM vtt_rollups GROUP BY 1
+        ) r
+        GROUP BY date
+        HAVING SUM(recordings) > 0;
+    END IF;
+
+    INSERT INTO vtt_counters (name, value) VALUES
+        ('total_installs', (SELECT COUNT(*) FROM vtt_installs)),
+        ('total_downloads', (SELECT COUNT(*) FROM vtt_downloads))
+    ON CONFLICT (name) DO NOTHING;
+
+    -- users для строк, заполненных до появления колонки (идемпотентно)
+    UPDATE vtt_event_daily d SET users = u.users
+    FROM (SELECT date, event_type, COUNT(*) AS users FROM vtt_event_daily_devices GROUP BY 1, 2) u
+    WHERE d.date = u.date AND d.event_type = u.event_type AND d.users <> u.users;
+END $$;
+
+-- Вьюхи для дашборда (читают только агрегаты)
+
+-- События по дням и типам
+CREATE OR REPLACE VIEW vtt_event_counts_daily AS
+SELECT
+    d.date,
+    d.event_type,
+    d.count,
+    d.users AS unique_users
+FROM vtt_event_daily d
+WHERE d.date > NOW() - INTERVAL '30 days';
 
 -- Общая статистика
 CREATE OR REPLACE VIEW vtt_stats AS
 SELECT
-    (SELECT COUNT(*) FROM vtt_installs) as total_installs,
+    (SELECT value FROM vtt_counters WHERE name = 'total_installs') as total_installs,
     (SELECT COUNT(*) FROM vtt_installs WHERE last_seen > NOW() - INTERVAL '24 hours') as active_today,
     (SELECT COUNT(*) FROM vtt_installs WHERE last_seen > NOW() - INTERVAL '7 days') as active_week,
-    (SELECT COUNT(*) FROM vtt_recordings) as total_recordings,
-    (SELECT COUNT(*) FROM vtt_recordings WHERE created_at > NOW() - INTERVAL '24 hours') as recordings_today,
+    (SELECT COALESCE(SUM(recordings), 0)::BIGINT FROM vtt_recordings_daily) as total_recordings,
+    (SELECT COALESCE(SUM(recordings), 0)::BIGINT FROM vtt_recordings_daily
+     WHERE date = (NOW() AT TIME ZONE 'UTC')::DATE) as recordings_today,
     (SELECT COUNT(*) FROM vtt_installs WHERE is_premium = true) as premium_users,
-    (SELECT COUNT(*) FROM vtt_downloads) as total_downloads;
+    (SELECT value FROM vtt_counters WHERE name = 'total_downloads') as total_downloads;
 
 -- Статистика по дням
 CREATE OR REPLACE VIEW vtt_daily_stats AS
 SELECT
-    DATE(created_at) as date,
-    COUNT(*) as events,
-    COUNT(DISTINCT device_id) as unique_users
-FROM vtt_events
-WHERE created_at > NOW() - INTERVAL '30 days'
-GROUP BY DATE(created_at)
-ORDER BY date DESC;
+    d.date,
+    SUM(d.count)::BIGINT as events,
+    (SELECT COUNT(DISTINCT device_id) FROM vtt_event_daily_devices v WHERE v.date = d.date) as unique_users
+FROM vtt_event_daily d
+WHERE d.date > NOW() - INTERVAL '30 days'
+GROUP BY d.date
+ORDER BY d.date DESC;
 
 -- Популярные события
 CREATE OR REPLACE VIEW vtt_event_stats AS
 SELECT
-    event_type,
-    COUNT(*) as count,
-    COUNT(DISTINCT device_id) as unique_users
-FROM vtt_events
-WHERE created_at > NOW() - INTERVAL '7 days'
-GROUP BY event_type
+    d.event_type,
+    SUM(d.count)::BIGINT as count,
+    (SELECT COUNT(DISTINCT device_id) FROM vtt_event_daily_devices v
+     WHERE v.event_type = d.event_type AND v.date > NOW() - INTERVAL '7 days') as unique_users
+FROM vtt_event_daily d
+WHERE d.date > NOW() - INTERVAL '7 days'
+GROUP BY d.event_type
 ORDER BY count DESC;
 
+-- Прежняя вьюха сканировала сырые события
+DROP VIEW IF EXISTS vtt_event_rows;
+
 -- Функция для трекинга сессий (upsert)
-CREATE OR REPLACE FUNCTION track_session(p_device_id TEXT, p_app_version TEXT)
+-- p_event_id: ключ идемпотентности, повторная отправка из спула не считается новой сессией
+-- p_app_launch: записать и событие app_launch (клиент делает один вызов на запуск;
+-- старые версии шлют событие сами и параметр не передают)
+DROP FUNCTION IF EXISTS track_session(TEXT, TEXT);
+DROP FUNCTION IF EXISTS track_session(TEXT, TEXT, UUID);
+CREATE OR REPLACE FUNCTION track_session(
+    p_device_id TEXT, p_app_version TEXT, p_event_id UUID DEFAULT NULL,
+    p_seen_at TIMESTAMPTZ DEFAULT NOW(), p_app_launch BOOLEAN DEFAULT FALSE)
 RETURNS void AS $$
 BEGIN
+    IF p_event_id IS NOT NULL THEN
+        INSERT INTO vtt_ingested (event_id) VALUES (p_event_id) ON CONFLICT DO NOTHING;
+        IF NOT FOUND THEN
+            RETURN;  -- Уже обработано
+        END IF;
+    END IF;
+
     INSERT INTO vtt_installs (device_id, app_version, last_seen, total_sessions)
     VALUES (p_device_id, p_app_version, NOW(), 1)
     ON CONFLICT (device_id)
@@ -131,5 +507,63 @@ BEGIN
         last_seen = NOW(),
         total_sessions = vtt_installs.total_sessions + 1,
         app_version = p_app_version;
+
+    IF p_app_launch THEN
+        INSERT INTO vtt_events (device_id, event_type, event_data, app_version, created_at, event_id)
+        VALUES (p_device_id, 'app_launch', '{}', p_app_version, p_seen_at, p_event_id);
+    END IF;
 END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;  -- vtt_ingested закрыта RLS
+
+-- Число уникальных пользователей (футер приложения, дашборд).
+-- Читает счётчик total_installs, который триггер trg_installs_count ведёт при
+-- вставке новых устройств (track_session/track_install), а не COUNT(DISTINCT).
+DROP FUNCTION IF EXISTS count_unique_users();
+CREATE OR REPLACE FUNCTION count_unique_users()
+RETURNS BIGINT AS $$
+    SELECT COALESCE((SELECT value FROM vtt_counters WHERE name = 'total_installs'), 0);
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+-- Ошибки: upsert по (устройство, отпечаток, день) с увеличением счётчика.
+-- Текст и стек приходят с первым случаем, повторы - только p_count
+CREATE OR REPLACE FUNCTION track_error(
+    p_device_id TEXT, p_fingerprint TEXT, p_count INT DEFAULT 1,
+    p_error_type TEXT DEFAULT NULL, p_error_message TEXT DEFAULT NULL, p_stack_trace TEXT DEFAULT NULL,
+    p_app_version TEXT DEFAULT NULL, p_os TEXT DEFAULT NULL,
+    p_seen_at TIMESTAMPTZ DEFAULT NOW(), p_event_id UUID DEFAULT NULL)
+RETURNS void AS $$
+BEGIN
+    IF p_event_id IS NOT NULL THEN
+        INSERT INTO vtt_ingested (event_id) VALUES (p_event_id) ON CONFLICT DO NOTHING;
+        IF NOT FOUND THEN
+            RETURN;  -- Уже обработано
+        END IF;
+    END IF;
+
+    INSERT INTO vtt_errors (device_id, fingerprint, window_start, occurrences, error_type,
+                            error_message, stack_trace, app_version, os, created_at, last_seen)
+    VALUES (p_device_id, p_fingerprint, (p_seen_at AT TIME ZONE 'UTC')::DATE, p_count, p_error_type,
+            p_error_message, p_stack_trace, p_app_version, p_os, p_seen_at, p_seen_at)
+    ON CONFLICT (device_id, fingerprint, window_start)
+    DO UPDATE SET
+        occurrences = vtt_errors.occurrences + EXCLUDED.occurrences,
+        last_seen = GREATEST(vtt_errors.last_seen, EXCLUDED.last_seen),
+        error_message = COALESCE(vtt_errors.error_message, EXCLUDED.error_message),
+        stack_trace = COALESCE(vtt_errors.stack_trace, EXCLUDED.stack_trace),
+        app_version = COALESCE(EXCLUDED.app_version, vtt_errors.app_version);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;  -- vtt_ingested закрыта RLS
+
+-- Самые частые ошибки за неделю
+CREATE OR REPLACE VIEW vtt_error_stats AS
+SELECT
+    fingerprint,
+    MIN(error_type) AS error_type,
+    MIN(error_message) AS error_message,
+    SUM(occurrences)::BIGINT AS occurrences,
+    COUNT(DISTINCT device_id) AS devices,
+    MAX(last_seen) AS last_seen
+FROM vtt_errors
+WHERE fingerprint IS NOT NULL AND window_start > NOW() - INTERVAL '7 days'
+GROUP BY fingerprint
+ORDER BY occurrences DESC;
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from analytics import BatchUploader
+from analytics_spool import Spool
+
+
+class HTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status)
+
+
+class FakeSession:
+    """Answers every POST with `status`, like requests.Session."""
+
+    def __init__(self, status):
+        self.status = status
+        self.posts = 0
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.posts += 1
+
+        def raise_for_status():
+            if self.status >= 400:
+                raise HTTPError(self.status)
+
+        return SimpleNamespace(raise_for_status=raise_for_status)
+
+
+def make_uploader(tmp_path, status, rows=3):
+    spool = Spool(str(tmp_path / "spool"))
+    for i in range(rows):
+        spool.append("vtt_errors", {"event_id": f"e{i}"})
+    uploader = BatchUploader(spool=spool)
+    uploader._session = FakeSession(status)
+    return uploader
+
+
+def test_conflict_batch_is_dropped_not_retried(tmp_path):
+    uploader = make_uploader(tmp_path, 409)
+    assert uploader._drain()
+    assert uploader.rejected_rows == 3
+    assert not uploader.spool.pending
+    # Nothing left to block later rows
+    assert uploader._drain()
+    assert uploader._session.posts == 1
+
+
+def test_server_error_keeps_the_segment(tmp_path):
+    uploader = make_uploader(tmp_path, 503)
+    assert not uploader._drain()
+    assert uploader.rejected_rows == 0
+    assert uploader.spool.pending
@@ -0,0 +1,61 @@
+import threading
+
+from ui_dispatch import UIDispatcher
+
+
+class FakeRoot:
+    """Tk stand-in: after() records its caller; run() plays the main loop."""
+
+    def __init__(self):
+        self.timers = {}
+        self.callers = []
+        self._ids = 0
+
+    def after(self, delay_ms, fn):
+        self.callers.append(threading.current_thread())
+        self._ids += 1
+        self.timers[self._ids] = fn
+        return self._ids
+
+    def after_cancel(self, job):
+        self.timers.pop(job, None)
+
+    def run(self):
+        timers, self.timers = self.timers, {}
+        for fn in timers.values():
+            fn()
+
+
+def test_post_from_worker_before_mainloop():
+    root = FakeRoot()
+    ui = UIDispatcher(root)
+    done = []
+
+    worker = threading.Thread(target=lambda: ui.post(done.append, "ready"))
+    worker.start()
+    worker.join()
+
+    assert done == []
+    assert all(caller is threading.main_thread() for caller in root.callers)
+    root.run()  # mainloop() starts
+    assert done == ["ready"]
+    assert all(caller is threading.main_thread() for caller in root.callers)
+
+
+def test_same_key_is_coalesced():
+    root = FakeRoot()
+    ui = UIDispatcher(root)
+    seen = []
+    for level in range(5):
+        ui.post(seen.append, level, key="level")
+    root.run()
+    assert seen == [4]
+    assert ui.stats()["coalesced"] == 4
+
+
+def test_close_stops_the_timer():
+    root = FakeRoot()
+    ui = UIDispatcher(root)
+    ui.close()
+    ui.post(print, "late")
+    assert root.timers == {}
@@ -0,0 +1,251 @@
+"""
+VTT Transcriber
+Picks the Whisper model per recording and tracks how fast each model answers.
+"""
+import threading
+import time
+from collections import deque
+
+from jobs import CancellableUpload, JobCancelled
+from resilience import Deadline, call_with_retry, deadline_for_audio, get_breaker
+
+# Available Groq Whisper models
+WHISPER_MODEL_FAST = "whisper-large-v3-turbo"
+WHISPER_MODEL_ACCURATE = "whisper-large-v3"
+
+# "auto" = choose per recording, anything else = always use that model
+MODEL_AUTO = "auto"
+
+# Upper bounds (seconds) of latency histogram buckets, last one catches the rest
+LATENCY_BUCKETS = [0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, float("inf")]
+
+# Processing seconds per second of audio when nothing was observed yet
+DEFAULT_REALTIME_FACTOR = {
+    WHISPER_MODEL_FAST: 0.03,
+    WHISPER_MODEL_ACCURATE: 0.08,
+}
+DEFAULT_OVERHEAD = 0.4  # Network + upload, seconds
+
+
+class LatencyHistogram:
+    """Bucketed latency counts plus a short window of recent samples."""
+
+    def __init__(self, window=50):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)  # (duration, latency)
+
+    def record(self, duration, latency):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += latency
+        self.recent.append((duration, latency))
+
+    def percentile(self, p):
+        """Percentile (0-100) over recent samples, None if empty."""
+        if not self.recent:
+            return None
+        values = sorted(lat for _, lat in self.recent)
+        idx = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+        return round(values[idx], 3)
+
+    def to_dict(self):
+        buckets = {}
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            key = "inf" if bound == float("inf") else f"{bound:g}"
+            buckets[key] = count
+        return {
+            "count": self.total,
+            "avg": round(self.sum / self.total, 3) if self.total else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "buckets": buckets,
+        }
+
+
+class ModelSelector:
+    """Model tiering policy.
+
+    Short dictations go to the fast model. Longer ones use the accurate model
+    as long as its predicted latency fits the target. Low-confidence output of
+    the fast model is escalated to the accurate one.
+    """
+
+    def __init__(self, model=MODEL_AUTO, fast_model=WHISPER_MODEL_FAST,
+                 accurate_model=WHISPER_MODEL_ACCURATE, latency_target=2.0,
+                 short_duration=15.0, min_confidence=-0.7):
+        self.model = model
+        self.fast_model = fast_model
+        self.accurate_model = accurate_model
+        self.latency_target = latency_target
+        self.short_duration = short_duration
+        self.min_confidence = min_confidence  # Mean avg_logprob of segments
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def configure(self, model=None, latency_target=None):
+        """Apply user settings (called when settings change)."""
+        if model:
+            self.model = model
+        if latency_target:
+            self.latency_target = float(latency_target)
+
+    def predict_latency(self, model, duration):
+        """Estimate seconds to transcribe `duration` seconds of audio."""
+        with self._lock:
+            hist = self.histograms.get(model)
+            samples = list(hist.recent) if hist else []
+
+        if len(samples) < 3:
+            factor = DEFAULT_REALTIME_FACTOR.get(model, 0.1)
+            return DEFAULT_OVERHEAD + factor * duration
+
+        # Median latency per audio second, scaled to this recording
+        ratios = sorted(lat / max(dur, 1.0) for dur, lat in samples)
+        return ratios[len(ratios) // 2] * max(duration, 1.0)
+
+    def choose(self, duration):
+        """Pick the model for a recording of `duration` seconds."""
+        if self.model != MODEL_AUTO:
+            return self.model
+        if duration <= self.short_duration:
+            return self.fast_model
+        if self.predict_latency(self.accurate_model, duration) <= self.latency_target:
+            return self.accurate_model
+        return self.fast_model
+
+    def should_escalate(self, model, confidence):
+        """True if output of `model` is too unsure and worth redoing."""
+        if self.model != MODEL_AUTO or model == self.accurate_model:
+            return False
+        return confidence is not None and confidence < self.min_confidence
+
+    def record(self, model, duration, latency):
+        with self._lock:
+            hist = self.histograms.get(model)
+            if hist is None:
+                hist = self.histograms[model] = LatencyHistogram()
+            hist.record(duration, latency)
+
+    def stats(self):
+        """Per-model latency histograms (for debug output / tuning)."""
+        with self._lock:
+            return {model: hist.to_dict() for model, hist in self.histograms.items()}
+
+
+def _field(obj, name, default=None):
+    """Read a field from SDK objects and plain dicts alike."""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def transcript_confidence(result):
+    """Duration-weighted mean avg_logprob of a verbose_json result, or None."""
+    segments = _field(result, "segments") or []
+    total = 0.0
+    weight = 0.0
+    for seg in segments:
+        logprob = _field(seg, "avg_logprob")
+        if logprob is None:
+            continue
+        length = max(0.01, (_field(seg, "end", 0) or 0) - (_field(seg, "start", 0) or 0))
+        total += logprob * length
+        weight += length
+    return total / weight if weight else None
+
+
+def _result_text(result):
+    if isinstance(result, str):
+        return result.strip()
+    text = _field(result, "text")
+    return (text if text is not None else str(result)).strip()
+
+
+def _request(client, selector, model, filename, audio_bytes, duration, language, prompt,
+             deadline, breaker, token):
+    # Confidence is only needed when the answer may be escalated
+    verbose = model != selector.accurate_model and selector.model == MODEL_AUTO
+    params = {
+        "model": model,
+        "language": language,
+        "response_format": "verbose_json" if verbose else "text",
+    }
+    if prompt:
+        params["prompt"] = prompt
+
+    def attempt(timeout):
+        # Fresh reader per attempt; with a token the upload stops on cancel
+        body = CancellableUpload(audio_bytes, token) if token else audio_bytes
+        started = time.perf_counter()
+        result = client.audio.transcriptions.create(
+            file=(filename, body), timeout=timeout, **params
+        )
+        latency = time.perf_counter() - started
+        selector.record(model, duration, latency)
+        print(f"[MODEL] {model}: {duration:.1f}s audio in {latency:.2f}s")
+        return result
+
+    result = call_with_retry(attempt, deadline, breaker, token=token)
+
+    confidence = transcript_confidence(result) if verbose else None
+    return _result_text(result), confidence
+
+
+def transcribe(client, filename, audio_bytes, duration, language="ru",
+               prompt=None, selector=None, deadline=None, token=None, model=None):
+    """Transcribe audio with the model picked by the selector.
+
+    All requests share one deadline derived from the audio length and go
+    through the "groq" circuit breaker. A cancel token aborts the upload and
+    raises JobCancelled. Returns the recognized text (may be
+    empty). API errors, CircuitOpenError and DeadlineExceeded are raised.
+    """
+    return transcribe_with_model(client, filename, audio_bytes, duration, language,
+                                 prompt, selector, deadline, token, model)[0]
+
+
+def transcribe_with_model(client, filename, audio_bytes, duration, language="ru",
+                          prompt=None, selector=None, deadline=None, token=None, model=None):
+    """Like transcribe(), but returns (text, model that produced it).
+
+    `model` forces one model: no tiering and no escalation.
+    """
+    selector = selector or get_selector()
+    deadline = deadline or Deadline(deadline_for_audio(duration))
+    breaker = get_breaker("groq")
+
+    forced = model is not None
+    model = model or selector.choose(duration)
+    text, confidence = _request(client, selector, model, filename, audio_bytes,
+                                duration, language, prompt, deadline, breaker, token)
+
+    # Escalate only if there is still time left for a second request
+    if not forced and selector.should_escalate(model, confidence) and \
+            deadline.remaining() > selector.predict_latency(selector.accurate_model, duration):
+        print(f"[MODEL] Low confidence {confidence:.2f}, retrying with {selector.accurate_model}")
+        try:
+            text, _ = _request(client, selector, selector.accurate_model, filename,
+                               audio_bytes, duration, language, prompt, deadline, breaker, token)
+            model = selector.accurate_model
+        except JobCancelled:
+            raise
+        except Exception as e:
+            # Keep the fast model's answer rather than failing the dictation
+            print(f"[MODEL] Escalation failed: {e}")
+    return text, model
+
+
+# Global selector instance
+_selector = None
+
+def get_selector():
+    """Get or create global model selector."""
+    global _selector
+    if _selector is None:
+        _selector = ModelSelector()
+    return _selector
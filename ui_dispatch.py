@@ -0,0 +1,119 @@
+"""
+VTT UI dispatcher
+The only way background threads touch Tk: updates are queued here and
+run on the Tk thread. Updates with the same key are coalesced to the
+latest one (level bar, timer), so a busy audio callback can't flood Tk.
+"""
+import itertools
+import statistics
+import threading
+import time
+import tkinter
+from collections import deque
+
+DRAIN_INTERVAL_MS = 16  # While updates keep coming
+IDLE_INTERVAL_MS = 50   # Poll while the queue is empty
+
+
+class UIDispatcher:
+    """Thread-safe queue of UI updates drained by a timer on the Tk thread.
+
+    Create it on the Tk thread. post() never calls into Tk: with threaded
+    Tcl, after() from another thread blocks until the main loop answers it
+    and raises before mainloop() has started, so a post from a startup
+    worker could be lost. Posts made before mainloop() run once it starts.
+    """
+
+    def __init__(self, root, interval_ms=DRAIN_INTERVAL_MS, idle_interval_ms=IDLE_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self._pending = {}  # key -> (fn, args, kwargs, posted_at); insertion ordered
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._job = None
+        self._closed = False
+
+        # Metrics
+        self.wakeups = 0
+        self.posted = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.max_depth = 0
+        self._latency = deque(maxlen=500)
+        self._drain_time = deque(maxlen=500)
+
+        self._schedule(self.idle_interval_ms)
+
+    def post(self, fn, *args, key=None, **kwargs):
+        """Run fn(*args, **kwargs) on the Tk thread. Same key = only the latest call runs."""
+        now = time.perf_counter()
+        with self._lock:
+            self.posted += 1
+            if key is None:
+                key = next(self._seq)
+            elif key in self._pending:
+                self.coalesced += 1
+                # Keep the original enqueue time - that is the real latency
+                now = self._pending[key][3]
+            self._pending[key] = (fn, args, kwargs, now)
+            self.max_depth = max(self.max_depth, len(self._pending))
+
+    def _schedule(self, delay_ms):
+        # Tk thread only
+        try:
+            self._job = self.root.after(delay_ms, self._drain)
+        except (RuntimeError, tkinter.TclError):
+            self._job = None  # Root destroyed - nothing left to update
+
+    def _drain(self):
+        self._job = None
+        if self._closed:
+            return
+        self.wakeups += 1
+        started = time.perf_counter()
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            self._schedule(self.idle_interval_ms)
+            return
+        for fn, args, kwargs, posted_at in batch.values():
+            self._latency.append(started - posted_at)
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"[UI] {getattr(fn, '__name__', fn)} failed: {e}")
+        self.executed += len(batch)
+        self._drain_time.append(time.perf_counter() - started)
+        # Updates are flowing - look again soon
+        self._schedule(self.interval_ms)
+
+    def close(self):
+        """Stop the drain timer (Tk thread). Later posts are dropped."""
+        self._closed = True
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except tkinter.TclError:
+                pass
+            self._job = None
+
+    @property
+    def depth(self):
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        latency = sorted(self._latency)
+        drains = list(self._drain_time)
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "posted": self.posted,
+            "wakeups": self.wakeups,
+            "coalesced": self.coalesced,
+            "executed": self.executed,
+            "latency_ms_avg": round(statistics.fmean(latency) * 1000, 2) if latency else 0,
+            "latency_ms_p95": round(latency[int(len(latency) * 0.95)] * 1000, 2) if latency else 0,
+            "drain_ms_avg": round(statistics.fmean(drains) * 1000, 2) if drains else 0,
+        }